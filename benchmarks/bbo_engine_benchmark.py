@@ -0,0 +1,147 @@
+"""
+BBO Engine Benchmark
+
+Measures BBOEngine.update throughput for symbols quoted by several venues, compared with
+recomputing the BBO by rescanning all venue quotes on every update. The rescan baseline does the same
+work otherwise: event time conversion, stale venue expiry, time priority on equal prices and building
+the consolidated quote events. Both must emit the same BBOs.
+
+Usage:
+    python -m benchmarks.bbo_engine_benchmark --symbols 5 --venues 8 --updates 200000
+"""
+import argparse
+import heapq
+import random
+import time
+from datetime import datetime as dtt, timedelta
+
+from src.constants import NY_TZ, ASSET_TYPE_CRYPTO, EVENT_TYPE_QUOTE
+from src.core.bbo_engine import BBOEngine, make_bbo_event
+from src.utils import to_epoch_us
+
+
+def make_quotes(num_symbols: int, num_venues: int, num_updates: int, updates_per_s: int, seed: int=1) -> list[dict]:
+    """
+    Random walk quotes, evenly spread over symbols and venues at updates_per_s per symbol
+    """
+    rng = random.Random(seed)
+    start = NY_TZ.localize(dtt(2026, 2, 13, 9, 30))
+    mids = {f'sym{i}': 100.0 for i in range(num_symbols)}
+    quotes = []
+    for i in range(num_updates):
+        symbol = f'sym{i % num_symbols}'
+        mids[symbol] += rng.gauss(0, 0.01)
+        spread = rng.uniform(0.01, 0.05)
+        quotes.append({
+            'asset_type': ASSET_TYPE_CRYPTO,
+            'event_type': EVENT_TYPE_QUOTE,
+            'symbol': symbol,
+            'bid': round(mids[symbol] - spread, 2),
+            'ask': round(mids[symbol] + spread, 2),
+            'bid_size': rng.uniform(1, 10),
+            'ask_size': rng.uniform(1, 10),
+            'source': 'bench',
+            'exchange': f'venue{rng.randrange(num_venues)}',
+            'event_time': start + timedelta(seconds=(i // num_symbols) / updates_per_s),
+        })
+    return quotes
+
+
+class RescanBBO:
+    """
+    Baseline recomputing the best bid and ask over every venue of the symbol on each update
+    """
+    def __init__(self, stale_after_s: float):
+        self.stale_after_us = int(stale_after_s * 1_000_000)
+        self.books = {}
+        self.last_bbo = {}
+        self.expiry_heap = []
+        self.now_us = None
+
+    def update(self, data: dict) -> list[dict]:
+        symbol = data['symbol']
+        venue = data.get('exchange') or data['source']
+        event_us = to_epoch_us(data['event_time'])
+        book = self.books.setdefault(symbol, {})
+        previous = book.get(venue)
+        if previous is not None and event_us < previous[4]:
+            return []
+        if self.now_us is None or event_us > self.now_us:
+            self.now_us = event_us
+        # Time priority follows the time the venue quoted its current price, like the engine heaps
+        bid_us = previous[4] if previous is not None and previous[0] == data.get('bid') else event_us
+        ask_us = previous[5] if previous is not None and previous[2] == data.get('ask') else event_us
+        book[venue] = (data.get('bid'), data.get('bid_size'), data.get('ask'), data.get('ask_size'), bid_us, ask_us,
+                       event_us)
+        if previous is None:
+            heapq.heappush(self.expiry_heap, (event_us + self.stale_after_us, symbol, venue))
+
+        changed = {symbol}
+        while self.expiry_heap[0][0] <= self.now_us:
+            _, expired_symbol, expired_venue = heapq.heappop(self.expiry_heap)
+            quote = self.books[expired_symbol].get(expired_venue)
+            if quote is None:
+                continue
+            if quote[6] + self.stale_after_us > self.now_us:
+                heapq.heappush(self.expiry_heap, (quote[6] + self.stale_after_us, expired_symbol, expired_venue))
+                continue
+            del self.books[expired_symbol][expired_venue]
+            changed.add(expired_symbol)
+
+        bbos = []
+        created_at = None
+        for changed_symbol in changed:
+            book = self.books[changed_symbol]
+            bbo = self.get_bbo_with_priority(book)
+            if bbo == self.last_bbo.get(changed_symbol):
+                continue
+            self.last_bbo[changed_symbol] = bbo
+            if created_at is None:
+                created_at = dtt.now(NY_TZ)
+            bbos.append(make_bbo_event(changed_symbol, data.get('asset_type'), bbo, len(book), data['event_time'],
+                                       created_at))
+        return bbos
+
+    def get_bbo_with_priority(self, book: dict) -> tuple:
+        bid = min(((-quote[0], quote[4], venue) for venue, quote in book.items() if quote[0] is not None),
+                  default=None)
+        ask = min(((quote[2], quote[5], venue) for venue, quote in book.items() if quote[2] is not None),
+                  default=None)
+        bid_venue = bid[2] if bid is not None else None
+        ask_venue = ask[2] if ask is not None else None
+        bid_px, bid_size = book[bid_venue][:2] if bid_venue is not None else (None, None)
+        ask_px, ask_size = book[ask_venue][2:4] if ask_venue is not None else (None, None)
+        return bid_px, bid_size, bid_venue, ask_px, ask_size, ask_venue
+
+
+def run(updater, quotes: list[dict]) -> tuple[float, list]:
+    start = time.perf_counter()
+    emitted = [bbo for data in quotes for bbo in updater.update(data)]
+    return time.perf_counter() - start, emitted
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument('--symbols', type=int, default=5)
+    arg_parser.add_argument('--venues', type=int, default=8)
+    arg_parser.add_argument('--updates', type=int, default=200_000)
+    arg_parser.add_argument('--updates-per-s', type=int, default=5_000, help='event time rate per symbol')
+    arg_parser.add_argument('--stale-after-s', type=float, default=1.0)
+    args = arg_parser.parse_args()
+
+    quotes = make_quotes(args.symbols, args.venues, args.updates, args.updates_per_s)
+
+    engine_s, engine_bbos = run(BBOEngine(stale_after_s=args.stale_after_s), quotes)
+    rescan_s, rescan_bbos = run(RescanBBO(stale_after_s=args.stale_after_s), quotes)
+    key_fields = ('symbol', 'bid', 'bid_exchange', 'ask', 'ask_exchange', 'num_venues')
+    assert [[bbo[field] for field in key_fields] for bbo in engine_bbos] == \
+        [[bbo[field] for field in key_fields] for bbo in rescan_bbos]
+
+    print(f'{args.updates} updates, {args.symbols} symbols, {args.venues} venues, '
+          f'{args.updates_per_s} updates/s per symbol in event time, {len(engine_bbos)} BBO changes')
+    print(f'BBOEngine : {args.updates / engine_s:,.0f} updates/s '
+          f'({args.updates / engine_s / args.symbols:,.0f} per symbol)')
+    print(f'Rescan    : {args.updates / rescan_s:,.0f} updates/s ({rescan_s / engine_s:.2f}x engine time)')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,157 @@
+"""
+Tiingo Frame Decoder Benchmark
+
+Compares the frame decoders with generic json.loads decoding of the whole frame.
+By default the frames of benchmarks/data/tiingo_ws_frames_sample.txt are decoded, cycled up to --frames-count.
+Frame files hold one frame per line, prefixed with the endpoint (iex, fx or crypto) and a space.
+
+The committed sample follows the Tiingo WebSocket message format, with an initialisation frame per connection
+and a heartbeat every 30s. Capture frames from a live feed with --record (uses the configured Tiingo key),
+or generate frames with a chosen heartbeat ratio with --synthetic.
+
+Usage:
+    python -m benchmarks.tiingo_decoder_benchmark --frames-count 200000
+    python -m benchmarks.tiingo_decoder_benchmark --synthetic --heartbeat-ratio 0.1
+    python -m benchmarks.tiingo_decoder_benchmark --record crypto --tickers btcusd,ethusd --record-count 5000 \
+        --frames recorded_frames.txt
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import random
+import ssl
+import time
+import certifi
+import websockets
+
+import src.data.data_config as data_cfg
+from src.data.sources.tiingo_decoders import IEX_DECODER, FX_DECODER, CRYPTO_DECODER
+from src.data.sources.tiingo_ws import get_top_book_trade_event_payload
+
+DECODERS = {'iex': IEX_DECODER, 'fx': FX_DECODER, 'crypto': CRYPTO_DECODER}
+WS_URLS = {'iex': data_cfg.TIINGO_WS_IEX_URL, 'fx': data_cfg.TIINGO_WS_FX_URL, 'crypto': data_cfg.TIINGO_WS_CRYPTO_URL}
+THRESHOLD_LEVELS = {'iex': 6, 'fx': 5, 'crypto': 2}
+SAMPLE_FRAMES_FP = os.path.join(os.path.dirname(__file__), 'data', 'tiingo_ws_frames_sample.txt')
+HEARTBEAT = '{"messageType":"H","response":{"code":200,"message":"HeartBeat"}}'
+
+
+def make_frames(frames_count: int, heartbeat_ratio: float, seed: int=0) -> list[tuple[str, str]]:
+    """
+    Generate (endpoint, frame) pairs of Tiingo WebSocket frames
+    """
+    rng = random.Random(seed)
+    frames = []
+    for i in range(frames_count):
+        endpoint = ('iex', 'fx', 'crypto')[i % 3]
+        if rng.random() < heartbeat_ratio:
+            frames.append((endpoint, HEARTBEAT))
+            continue
+        date_iso = f'2026-02-13T15:{i // 60_000 % 60:02d}:{i // 1000 % 60:02d}.{i % 1000:03d}000+00:00'
+        price = round(100 + rng.random(), 6)
+        if endpoint == 'iex':
+            data = [date_iso, f'sym{i % 50}', price]
+            service = 'iex'
+        elif endpoint == 'fx':
+            data = ['Q', f'fx{i % 20}', date_iso, 1e6, price - 0.01, price, 1e6, price + 0.01]
+            service = 'fx'
+        elif i % 2:
+            data = ['T', f'crypto{i % 20}', date_iso, 'gdax', rng.random(), price]
+            service = 'crypto_data'
+        else:
+            data = ['Q', f'crypto{i % 20}', date_iso, 'kraken', 1.5, price - 0.01, price, 2.5, price + 0.01]
+            service = 'crypto_data'
+        frames.append((endpoint, json.dumps({'messageType': 'A', 'service': service, 'data': data},
+                                            separators=(',', ':'))))
+    return frames
+
+
+def read_frames(frames_fp: str, frames_count: int) -> list[tuple[str, str]]:
+    """
+    Read (endpoint, frame) pairs from a frame file, cycling the file up to frames_count frames
+    """
+    with open(frames_fp) as f:
+        frames = [tuple(line.rstrip('\n').split(' ', 1)) for line in f if line.strip()]
+    return list(itertools.islice(itertools.cycle(frames), frames_count))
+
+
+async def record_frames(endpoint: str, tickers: list, frames_count: int, frames_fp: str):
+    """
+    Append frames received from a live Tiingo WebSocket endpoint to a frame file
+    """
+    payload = get_top_book_trade_event_payload(tickers, threshold_level=THRESHOLD_LEVELS[endpoint])
+    ssl_context = ssl.create_default_context(cafile=certifi.where())
+    async with websockets.connect(WS_URLS[endpoint], ssl=ssl_context) as ws:
+        await ws.send(json.dumps(payload))
+        with open(frames_fp, 'a') as f:
+            for _ in range(frames_count):
+                frame = await ws.recv()
+                f.write(f'{endpoint} {frame.replace(chr(10), " ")}\n')
+
+
+def json_loads_decode(frames: list[str]) -> list:
+    """
+    Generic decoding path: json.loads of every frame, then dropping heartbeat and initialisation frames
+    """
+    records = []
+    for frame in frames:
+        msg_json = json.loads(frame)
+        if msg_json and msg_json.get('messageType') not in ('I', 'H'):
+            data = msg_json.get('data')
+            if data:
+                records.append(data)
+    return records
+
+
+def time_decode(decode, frames_by_decoder: dict, repeat: int) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for decoder, frames in frames_by_decoder.items():
+            decode(decoder, frames)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--frames', default=SAMPLE_FRAMES_FP, help='Frame file, one endpoint and frame per line')
+    parser.add_argument('--frames-count', type=int, default=200_000)
+    parser.add_argument('--synthetic', action='store_true', help='Generate frames instead of reading --frames')
+    parser.add_argument('--heartbeat-ratio', type=float, default=0.1, help='Heartbeat ratio of generated frames')
+    parser.add_argument('--record', choices=list(DECODERS), help='Record frames of a live endpoint to --frames')
+    parser.add_argument('--tickers', default='btcusd,ethusd', help='Comma separated tickers to record')
+    parser.add_argument('--record-count', type=int, default=5_000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    if args.record:
+        asyncio.run(record_frames(args.record, args.tickers.split(','), args.record_count, args.frames))
+        print(f'Recorded {args.record_count} {args.record} frames to {args.frames}')
+        return
+
+    frames = make_frames(args.frames_count, args.heartbeat_ratio) if args.synthetic \
+        else read_frames(args.frames, args.frames_count)
+    frames_by_decoder = {decoder: [] for decoder in DECODERS.values()}
+    for endpoint, frame in frames:
+        frames_by_decoder[DECODERS[endpoint]].append(frame)
+
+    for decoder, decoder_frames in frames_by_decoder.items():
+        records = decoder.decode_batch(decoder_frames)
+        expected = json_loads_decode(decoder_frames)
+        assert [list(record) if isinstance(record, tuple) else record for record in records] == expected
+
+    heartbeats = sum(frame.startswith('{"messageType":"H"') for _, frame in frames)
+    json_s = time_decode(lambda decoder, decoder_frames: json_loads_decode(decoder_frames), frames_by_decoder,
+                         args.repeat)
+    decoder_s = time_decode(lambda decoder, decoder_frames: decoder.decode_batch(decoder_frames), frames_by_decoder,
+                            args.repeat)
+    print(f'{len(frames)} frames from {"generated frames" if args.synthetic else args.frames}, '
+          f'{heartbeats / len(frames):.1%} heartbeats')
+    print(f'json.loads: {json_s:.3f}s, {len(frames) / json_s / 1e3:.0f}k frames/s')
+    print(f'decoders:   {decoder_s:.3f}s, {len(frames) / decoder_s / 1e3:.0f}k frames/s ({json_s / decoder_s:.2f}x)')
+
+
+if __name__ == '__main__':
+    main()
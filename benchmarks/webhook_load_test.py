@@ -0,0 +1,109 @@
+"""
+Webhook Load Test
+
+Runs the webhook route on a local uvicorn server and measures sustained requests/s and events/s
+with concurrent clients posting batched payloads. A drain task empties the market feed queues
+in place of the consolidator.
+
+Usage:
+    python -m benchmarks.webhook_load_test --requests 2000 --batch-size 100 --concurrency 16 --format ndjson
+"""
+import argparse
+import asyncio
+import json
+import socket
+import threading
+import time
+import httpx
+import uvicorn
+from fastapi import FastAPI
+
+from src.api.webhook_api import router as webhook_router, get_queues
+
+
+def make_body(batch_size: int, body_format: str) -> tuple[bytes, str]:
+    events = []
+    for i in range(batch_size):
+        if i % 2:
+            events.append({'event_type': 'quote', 'symbol': f'sym{i % 20}', 'bid': 99.5, 'ask': 100.5,
+                           'bid_size': 1.0, 'ask_size': 2.0, 'event_time': f'2026-02-13T15:00:00.{i:06d}+00:00'})
+        else:
+            events.append({'event_type': 'trade', 'symbol': f'sym{i % 20}', 'price': 100.0, 'size': 0.5,
+                           'exchange': 'bench', 'event_time': f'2026-02-13T15:00:00.{i:06d}+00:00'})
+    if body_format == 'ndjson':
+        return '\n'.join(json.dumps(event) for event in events).encode(), 'application/x-ndjson'
+    return json.dumps(events).encode(), 'application/json'
+
+
+def create_app() -> FastAPI:
+    app = FastAPI()
+    app.include_router(webhook_router)
+
+    async def drain():
+        while True:
+            for queue in get_queues().values():
+                while not queue.empty():
+                    queue.get_nowait()
+                    queue.task_done()
+            await asyncio.sleep(0.001)
+
+    @app.on_event('startup')
+    async def startup():
+        asyncio.create_task(drain())
+
+    return app
+
+
+def start_server(port: int) -> uvicorn.Server:
+    server = uvicorn.Server(uvicorn.Config(create_app(), host='127.0.0.1', port=port, log_level='warning'))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    return server
+
+
+async def run_load(url: str, body: bytes, content_type: str, num_requests: int, concurrency: int) -> dict:
+    statuses = {}
+    remaining = iter(range(num_requests))
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(limits=limits, timeout=30.0) as client:
+        async def worker():
+            for _ in remaining:
+                resp = await client.post(url, content=body, headers={'Content-Type': content_type})
+                statuses[resp.status_code] = statuses.get(resp.status_code, 0) + 1
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return statuses
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument('--requests', type=int, default=2000)
+    arg_parser.add_argument('--batch-size', type=int, default=100)
+    arg_parser.add_argument('--concurrency', type=int, default=16)
+    arg_parser.add_argument('--format', choices=['json', 'ndjson'], default='ndjson')
+    args = arg_parser.parse_args()
+
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        port = sock.getsockname()[1]
+    server = start_server(port)
+    body, content_type = make_body(args.batch_size, args.format)
+    url = f'http://127.0.0.1:{port}/webhooks/bench'
+
+    try:
+        asyncio.run(run_load(url, body, content_type, min(args.concurrency * 4, args.requests), args.concurrency))
+        started = time.perf_counter()
+        statuses = asyncio.run(run_load(url, body, content_type, args.requests, args.concurrency))
+        elapsed = time.perf_counter() - started
+    finally:
+        server.should_exit = True
+
+    accepted = statuses.get(202, 0)
+    print(f'{args.requests} requests of {args.batch_size} events ({args.format}, {len(body)} bytes), '
+          f'concurrency {args.concurrency}')
+    print(f'Statuses: {statuses}')
+    print(f'{args.requests / elapsed:,.0f} requests/s, {accepted * args.batch_size / elapsed:,.0f} events/s')
+
+
+if __name__ == '__main__':
+    main()
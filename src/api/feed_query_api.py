@@ -0,0 +1,66 @@
+"""
+Consolidated Feeds Query API
+
+FastAPI routes to query consolidated feeds by time range, symbols, event type and source.
+Results are streamed back as Arrow IPC stream or NDJSON without materialising the full result.
+"""
+import os
+from datetime import datetime as dtt
+from typing import Literal
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import StreamingResponse
+
+from src.constants import EVENT_TYPE_TRADE, EVENT_TYPE_QUOTE, EVENT_TYPE_REF_PX, EVENT_TYPE_BBO, LATE_PARTITION
+from src.core.feed_query import query_feeds, stream_arrow_ipc, stream_ndjson
+from src.logger import get_logger
+from src.utils import convert_dt_to_tz
+
+logger = get_logger(__name__)
+
+CONSOL_FEEDS_DIR = 'src/data/consol_feeds/'
+ARROW_STREAM_MEDIA_TYPE = 'application/vnd.apache.arrow.stream'
+NDJSON_MEDIA_TYPE = 'application/x-ndjson'
+
+router = APIRouter()
+
+
+def parse_list_param(values: list|None) -> list|None:
+    """
+    Flatten repeated and comma separated query parameter values. Eg. ['spy,aapl', 'msft'] -> ['spy', 'aapl', 'msft']
+    """
+    if not values:
+        return None
+    return [val.strip() for value in values for val in value.split(',') if val.strip()]
+
+
+@router.get('/feeds/{event_type}')
+def get_feeds(event_type: str,
+              start: dtt|None = None,
+              end: dtt|None = None,
+              symbols: list[str]|None = Query(default=None),
+              source: str|None = None,
+              columns: list[str]|None = Query(default=None),
+              late: bool = False,
+              format: Literal['arrow', 'ndjson'] = 'ndjson'):
+    """
+    Stream consolidated feeds of an event type matching the time range, symbols and source
+    Naive start / end datetimes are treated as UTC. late=true queries the late events partition instead
+    """
+    if event_type not in (EVENT_TYPE_TRADE, EVENT_TYPE_QUOTE, EVENT_TYPE_REF_PX, EVENT_TYPE_BBO):
+        raise HTTPException(status_code=404, detail=f'Unknown event type {event_type}')
+    start = convert_dt_to_tz(start) if start is not None else None
+    end = convert_dt_to_tz(end) if end is not None else None
+    if start is not None and end is not None and start > end:
+        raise HTTPException(status_code=422, detail='start must not be after end')
+
+    logger.info(f'Query {event_type} feeds start:{start} end:{end} symbols:{symbols} source:{source}')
+    try:
+        schema, batches = query_feeds(event_type, start=start, end=end, symbols=parse_list_param(symbols),
+                                      source=source, columns=parse_list_param(columns),
+                                      pq_dir=os.path.join(CONSOL_FEEDS_DIR, LATE_PARTITION) if late
+                                      else CONSOL_FEEDS_DIR)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    if format == 'arrow':
+        return StreamingResponse(stream_arrow_ipc(schema, batches), media_type=ARROW_STREAM_MEDIA_TYPE)
+    return StreamingResponse(stream_ndjson(batches), media_type=NDJSON_MEDIA_TYPE)
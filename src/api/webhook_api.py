@@ -0,0 +1,294 @@
+"""
+Webhook Ingestion API
+
+FastAPI route receiving batched vendor pushes as a JSON array (or single JSON object) or NDJSON.
+
+Key features:
+- Request bodies are parsed incrementally while they stream in, one event object at a time
+- Each batch is normalised in a single pass and pushed into the trade, quote and ref_px queues
+- Replies 202 as soon as the events are queued
+- Replies 503 with Retry-After when the queues are above their high-water mark, or would be with the batch,
+  instead of buffering without limit. A rejected batch is never partially queued
+- Replies 413 for requests above MAX_BODY_BYTES or MAX_EVENTS_PER_REQUEST, or with a single event above
+  MAX_EVENT_SIZE
+
+Event objects require event_type (trade, quote, ref_px), symbol and an ISO 8601 event_time, plus
+- trade: price (or last_price) and optional size (or last_size)
+- quote: bid and ask, optional bid_size, ask_size and mid
+- ref_px: price
+asset_type and exchange are optional. Invalid events are rejected individually.
+"""
+import codecs
+import json
+from datetime import datetime as dtt
+from typing import AsyncIterator
+from dateutil import parser
+from fastapi import APIRouter, Request
+from fastapi.responses import JSONResponse
+
+from src.constants import NY_TZ, EVENT_TYPE_TRADE, EVENT_TYPE_QUOTE, EVENT_TYPE_REF_PX
+from src.core.queue_manager import trade_queue, quote_queue, ref_px_queue
+from src.logger import get_logger
+from src.utils import convert_dt_to_tz
+
+logger = get_logger(__name__)
+
+MAX_QUEUE_SIZE = 100_000
+MAX_BODY_BYTES = 16 * 1024 * 1024
+MAX_EVENTS_PER_REQUEST = 10_000
+MAX_EVENT_SIZE = 64 * 1024
+RETRY_AFTER_S = 1
+NDJSON_MEDIA_TYPES = ('application/x-ndjson', 'application/ndjson', 'application/jsonl', 'application/json-lines')
+
+router = APIRouter()
+
+_json_decoder = json.JSONDecoder()
+
+
+class WebhookPayloadError(ValueError):
+    """
+    Raised when a webhook request body is not a valid JSON array, JSON object or NDJSON
+    """
+
+
+class WebhookPayloadTooLarge(WebhookPayloadError):
+    """
+    Raised when a webhook request body, or a single event in it, is above its size limit
+    """
+
+
+async def limit_body(chunks: AsyncIterator[bytes], max_bytes: int) -> AsyncIterator[bytes]:
+    """
+    Pass through the chunks of a request body, raising WebhookPayloadTooLarge once more than max_bytes are read
+    """
+    received = 0
+    async for chunk in chunks:
+        received += len(chunk)
+        if received > max_bytes:
+            raise WebhookPayloadTooLarge(f'Body above {max_bytes} bytes')
+        yield chunk
+
+
+async def iter_ndjson(chunks: AsyncIterator[bytes], max_event_size: int=MAX_EVENT_SIZE) -> AsyncIterator:
+    """
+    Incrementally parse newline delimited JSON from a stream of byte chunks, skipping blank lines
+    Lines longer than max_event_size bytes raise WebhookPayloadTooLarge
+    """
+    buffer = b''
+    async for chunk in chunks:
+        buffer += chunk
+        lines = buffer.split(b'\n')
+        buffer = lines.pop()
+        for line in lines:
+            if len(line) > max_event_size:
+                raise WebhookPayloadTooLarge(f'Event above {max_event_size} bytes')
+            if line.strip():
+                yield _loads(line)
+        if len(buffer) > max_event_size:
+            raise WebhookPayloadTooLarge(f'Event above {max_event_size} bytes')
+    if buffer.strip():
+        yield _loads(buffer)
+
+
+def _loads(line: bytes):
+    try:
+        return json.loads(line)
+    except ValueError as e:
+        raise WebhookPayloadError(f'Invalid NDJSON line: {e}') from e
+
+
+async def iter_json_array(chunks: AsyncIterator[bytes], max_event_size: int=MAX_EVENT_SIZE) -> AsyncIterator:
+    """
+    Incrementally parse the objects of a JSON array (or a single JSON object) from a stream of byte chunks
+    Each element is decoded as soon as it is complete, without waiting for the whole body
+    An incomplete element is decoded again only once a chunk with a closing brace arrives, and elements
+    longer than max_event_size characters raise WebhookPayloadTooLarge
+    """
+    decoder = codecs.getincrementaldecoder('utf-8')()
+    buffer = ''
+    pos = 0
+    state = 'start'
+    finished = False
+    incomplete = False
+    chunks = chunks.__aiter__()
+
+    while True:
+        while True:
+            while pos < len(buffer) and buffer[pos] in ' \t\r\n':
+                pos += 1
+            if pos == len(buffer):
+                break
+            char = buffer[pos]
+            if state == 'start':
+                if char == '[':
+                    state, pos = 'first', pos + 1
+                    continue
+                if char != '{':
+                    raise WebhookPayloadError('Body must be a JSON array or object')
+                state = 'single'
+            elif state == 'first' and char == ']':
+                # Only an empty array closes right after the opening bracket, not a trailing comma
+                state, pos = 'done', pos + 1
+                continue
+            elif state == 'sep':
+                if char == ',':
+                    state, pos = 'item', pos + 1
+                    continue
+                if char == ']':
+                    state, pos = 'done', pos + 1
+                    continue
+                raise WebhookPayloadError(f'Expected , or ] at position {pos}')
+            elif state == 'done':
+                raise WebhookPayloadError('Unexpected data after JSON array')
+
+            if char != '{':
+                raise WebhookPayloadError(f'Array elements must be JSON objects, got {char!r}')
+            try:
+                item, end = _json_decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                if finished:
+                    raise WebhookPayloadError('Incomplete or invalid JSON')
+                if len(buffer) - pos > max_event_size:
+                    raise WebhookPayloadTooLarge(f'Event above {max_event_size} characters')
+                incomplete = True
+                break  # object not complete yet, read more
+            incomplete = False
+            if end - pos > max_event_size:
+                raise WebhookPayloadTooLarge(f'Event above {max_event_size} characters')
+            pos = end
+            state = 'done' if state == 'single' else 'sep'
+            yield item
+
+        if finished:
+            if state != 'done':
+                raise WebhookPayloadError('Incomplete JSON array')
+            return
+        buffer, pos = buffer[pos:], 0
+        while True:
+            try:
+                text = decoder.decode(await chunks.__anext__())
+            except StopAsyncIteration:
+                text = decoder.decode(b'', final=True)
+                finished = True
+            except UnicodeDecodeError as e:
+                raise WebhookPayloadError(f'Invalid UTF-8: {e}') from e
+            buffer += text
+            # An incomplete object can only be completed by a closing brace
+            if finished or not incomplete or '}' in text:
+                break
+            if len(buffer) > max_event_size:
+                raise WebhookPayloadTooLarge(f'Event above {max_event_size} characters')
+
+
+def normalise_webhook_event(item: dict, vendor: str, source: str, created_at: dtt) -> tuple[str, dict]:
+    """
+    Normalise a webhook event object into the market feed format of its event type
+
+    Returns:
+        tuple: Event type and normalised data
+    Raises:
+        KeyError, TypeError, ValueError: If the event is missing required fields or has invalid values
+    """
+    event_type = item['event_type']
+    normalised_data = {
+        'asset_type': item.get('asset_type'),
+        'event_type': event_type,
+        'symbol': str(item['symbol']).lower(),
+    }
+    if event_type == EVENT_TYPE_TRADE:
+        normalised_data['last_size'] = _optional_float(item.get('size', item.get('last_size')))
+        normalised_data['last_price'] = float(item['price'] if 'price' in item else item['last_price'])
+    elif event_type == EVENT_TYPE_QUOTE:
+        bid, ask = float(item['bid']), float(item['ask'])
+        normalised_data['bid_size'] = _optional_float(item.get('bid_size'))
+        normalised_data['ask_size'] = _optional_float(item.get('ask_size'))
+        normalised_data['bid'] = bid
+        normalised_data['ask'] = ask
+        normalised_data['mid'] = float(item['mid']) if item.get('mid') is not None else (bid + ask) / 2
+    elif event_type == EVENT_TYPE_REF_PX:
+        normalised_data['price'] = float(item['price'])
+    else:
+        raise ValueError(f'Unknown event type {event_type}')
+    normalised_data['event_time'] = convert_dt_to_tz(parse_event_time(item['event_time']))
+    normalised_data['vendor'] = vendor
+    normalised_data['source'] = source
+    normalised_data['exchange'] = item.get('exchange')
+    normalised_data['created_at'] = created_at
+    return event_type, normalised_data
+
+
+def parse_event_time(event_time: str) -> dtt:
+    """
+    Parse an ISO 8601 timestamp, using the fast datetime.fromisoformat before falling back to dateutil
+    """
+    try:
+        return dtt.fromisoformat(event_time)
+    except ValueError:
+        return parser.isoparse(event_time)
+
+
+def _optional_float(value) -> float|None:
+    return float(value) if value is not None else None
+
+
+def get_queues() -> dict:
+    return {EVENT_TYPE_TRADE: trade_queue, EVENT_TYPE_QUOTE: quote_queue, EVENT_TYPE_REF_PX: ref_px_queue}
+
+
+def queues_full_response(vendor: str) -> JSONResponse:
+    logger.warning(f'Queues above {MAX_QUEUE_SIZE} events, rejecting {vendor} webhook')
+    return JSONResponse(status_code=503, content={'detail': 'Queues are full, retry later'},
+                        headers={'Retry-After': str(RETRY_AFTER_S)})
+
+
+@router.post('/webhooks/{vendor}', status_code=202)
+async def receive_webhook(vendor: str, request: Request):
+    """
+    Receive a batch of vendor events and push them into the market feed queues
+    The message is wrapped in a dictionary with the key market_feed
+    so that the consolidator processes it consistently with other market feeds
+    """
+    queues = get_queues()
+    if any(queue.qsize() >= MAX_QUEUE_SIZE for queue in queues.values()):
+        return queues_full_response(vendor)
+    content_length = request.headers.get('content-length')
+    if content_length and content_length.isdigit() and int(content_length) > MAX_BODY_BYTES:
+        return JSONResponse(status_code=413, content={'detail': f'Body above {MAX_BODY_BYTES} bytes'})
+
+    content_type = request.headers.get('content-type', '').split(';')[0].strip().lower()
+    parse = iter_ndjson if content_type in NDJSON_MEDIA_TYPES else iter_json_array
+    vendor = vendor.lower()
+    source = f'{vendor}_webhook'
+    created_at = dtt.now(NY_TZ)
+
+    batches = {event_type: [] for event_type in queues}
+    received = rejected = 0
+    try:
+        async for item in parse(limit_body(request.stream(), MAX_BODY_BYTES)):
+            received += 1
+            if received > MAX_EVENTS_PER_REQUEST:
+                raise WebhookPayloadTooLarge(f'More than {MAX_EVENTS_PER_REQUEST} events')
+            try:
+                event_type, normalised_data = normalise_webhook_event(item, vendor, source, created_at)
+            except (KeyError, TypeError, ValueError, OverflowError) as e:
+                rejected += 1
+                logger.debug(f'Rejected {vendor} webhook event {item}: {e!r}')
+                continue
+            batches[event_type].append({'market_feed': normalised_data})
+    except WebhookPayloadTooLarge as e:
+        return JSONResponse(status_code=413, content={'detail': str(e)})
+    except WebhookPayloadError as e:
+        return JSONResponse(status_code=400, content={'detail': str(e)})
+
+    # Other requests may have queued events while the body was read. Nothing is awaited from the check
+    # until the events are queued, so the whole batch is queued or none of it
+    if any(queues[event_type].qsize() + len(batch) > MAX_QUEUE_SIZE for event_type, batch in batches.items()):
+        return queues_full_response(vendor)
+    for event_type, batch in batches.items():
+        queue = queues[event_type]
+        for msg in batch:
+            queue.put_nowait(msg)
+
+    accepted = sum(len(batch) for batch in batches.values())
+    logger.debug(f'{vendor} webhook accepted {accepted} events, rejected {rejected}')
+    return {'accepted': accepted, 'rejected': rejected}
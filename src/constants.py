@@ -10,9 +10,14 @@ ASSET_TYPE_CRYPTO = 'crypto'
 EVENT_TYPE_TRADE = 'trade'
 EVENT_TYPE_QUOTE = 'quote'
 EVENT_TYPE_REF_PX = 'ref_px'
+EVENT_TYPE_BBO = 'bbo'
+
+LATE_PARTITION = 'late'
 
 VENDOR_TIINGO = 'tiingo'
 
+SOURCE_BBO = 'consolidated_bbo'
+
 EXCH_IEX = 'IEX'
 
 
@@ -0,0 +1,355 @@
+"""
+Bar Aggregator Module
+
+This module incrementally aggregates market feed events into time bars and writes them to
+Parquet files partitioned by event type, bar interval and date. Uses asyncio for asynchronous processing.
+
+Bars:
+- trade: OHLCV and VWAP bars from trade last prices and sizes
+- quote: mid based OHLC and TWAP bars from quote mids
+- ref_px: OHLC and TWAP bars from reference prices
+
+Bars are keyed by (source, symbol, interval, bar start) and close on the event-time watermark of their source,
+the maximum event_time seen from the source minus the allowed lateness. A source with skewed timestamps only
+closes its own bars. Bars of a source without events for idle_timeout_s are closed as they are.
+Events for already closed bars are dropped from them and counted once per event as late.
+Updating an open bar is a dict lookup, closing uses a heap per source ordered by bar end.
+Bars still open on shutdown are saved flagged as partial.
+"""
+import asyncio
+import heapq
+import os
+import time
+from typing import Callable
+from datetime import datetime as dtt
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+from src import constants
+from src.constants import EVENT_TYPE_TRADE, EVENT_TYPE_QUOTE, EVENT_TYPE_REF_PX
+from src.core.queue_manager import subscribe, unsubscribe
+from src.logger import get_logger
+from src.utils import to_epoch_us
+
+logger = get_logger(__name__)
+
+US_PER_S = 1_000_000
+
+
+class Bar:
+    """
+    Rolling state of a single open bar
+    """
+    __slots__ = ('source', 'symbol', 'asset_type', 'interval_s', 'start_us', 'end_us',
+                 'open', 'high', 'low', 'close', 'open_us', 'close_us', 'count',
+                 'volume', 'pv', 'tw_sum', 'tw_us', 'last_px', 'last_us', 'partial')
+
+    def __init__(self, source: str, symbol: str, asset_type: str, interval_s: int, start_us: int,
+                 price: float, event_us: int):
+        self.source = source
+        self.symbol = symbol
+        self.asset_type = asset_type
+        self.interval_s = interval_s
+        self.start_us = start_us
+        self.end_us = start_us + interval_s * US_PER_S
+        self.open = self.high = self.low = self.close = price
+        self.open_us = self.close_us = event_us
+        self.count = 0
+        self.volume = 0.0
+        self.pv = 0.0
+        self.tw_sum = 0.0
+        self.tw_us = 0
+        self.last_px = price
+        self.last_us = event_us
+        self.partial = False
+
+    def update(self, price: float, size: float, event_us: int):
+        """
+        Update the bar with an event. Open and close follow event_time so out of order events are handled,
+        time weighting only uses events arriving in event_time order
+        """
+        if price > self.high:
+            self.high = price
+        elif price < self.low:
+            self.low = price
+        if event_us < self.open_us:
+            self.open, self.open_us = price, event_us
+        if event_us >= self.close_us:
+            self.close, self.close_us = price, event_us
+        if event_us >= self.last_us:
+            self.tw_sum += self.last_px * (event_us - self.last_us)
+            self.tw_us += event_us - self.last_us
+            self.last_px, self.last_us = price, event_us
+        self.count += 1
+        self.volume += size
+        self.pv += price * size
+
+    def finalise(self, partial: bool=False):
+        """
+        Weight the last price until the end of the bar
+        A partial bar is closed before its end, its time weighting stops at the last event
+        """
+        if partial:
+            self.partial = True
+            return
+        self.tw_sum += self.last_px * (self.end_us - self.last_us)
+        self.tw_us += self.end_us - self.last_us
+
+
+def get_price_size(data: dict, event_type: str) -> tuple[float|None, float]:
+    """
+    Extract the bar price and size of a normalised event. Quotes use the mid, falling back to (bid + ask) / 2
+    """
+    if event_type == EVENT_TYPE_TRADE:
+        return data.get('last_price'), data.get('last_size') or 0.0
+    if event_type == EVENT_TYPE_QUOTE:
+        mid = data.get('mid')
+        if mid is None and data.get('bid') is not None and data.get('ask') is not None:
+            mid = (data['bid'] + data['ask']) / 2
+        return mid, 0.0
+    return data.get('price'), 0.0
+
+
+class BarAggregator:
+    """
+    Incrementally aggregates events of one event type into bars of several intervals
+
+    Args:
+        event_type: Event type of the aggregated events (trade, quote, ref_px)
+        intervals_s: Bar intervals in seconds. Eg. (1, 60) for 1s and 1m bars
+        allowed_lateness_s: Seconds each source watermark lags the maximum event_time seen from the source
+        idle_timeout_s: Seconds without events after which the open bars of a source are closed
+        clock: Monotonic clock in seconds used for idle detection
+    """
+    def __init__(self, event_type: str, intervals_s: tuple=(1, 60), allowed_lateness_s: float=1.0,
+                 idle_timeout_s: float=5.0, clock: Callable[[], float]=time.monotonic):
+        self.event_type = event_type
+        self.intervals_us = [(interval_s, interval_s * US_PER_S) for interval_s in intervals_s]
+        self.allowed_lateness_us = int(allowed_lateness_s * US_PER_S)
+        self.idle_timeout_s = idle_timeout_s
+        self.clock = clock
+        self.watermarks = {}
+        self.idle_closed = {}
+        self.source_last_seen = {}
+        self.open_bars = {}
+        self.close_heaps = {}
+        self.closed_bars = []
+        self.late_events = 0
+
+    def update(self, data: dict):
+        """
+        Add a normalised event to its open bars and close all bars of its source ending before the new watermark
+        """
+        price, size = get_price_size(data, self.event_type)
+        if price is None:
+            logger.debug(f'Skipping {self.event_type} event without price {data}')
+            return
+        event_us = to_epoch_us(data['event_time'])
+        source, symbol = data['source'], data['symbol']
+        source_watermark_us = self.watermarks.get(source)
+        close_heap = self.close_heaps.get(source)
+        if close_heap is None:
+            close_heap = self.close_heaps[source] = []
+
+        late = False
+        for interval_s, interval_us in self.intervals_us:
+            start_us = event_us - event_us % interval_us
+            end_us = start_us + interval_us
+            idle_closed_us = self.idle_closed.get((source, interval_s))
+            if (source_watermark_us is not None and end_us <= source_watermark_us) or \
+                    (idle_closed_us is not None and end_us <= idle_closed_us):
+                late = True
+                continue
+            key = (source, symbol, interval_s, start_us)
+            bar = self.open_bars.get(key)
+            if bar is None:
+                bar = Bar(source, symbol, data.get('asset_type'), interval_s, start_us, price, event_us)
+                self.open_bars[key] = bar
+                heapq.heappush(close_heap, (end_us, key))
+            bar.update(price, size, event_us)
+        if late:
+            self.late_events += 1
+
+        self.source_last_seen[source] = self.clock()
+        watermark_us = event_us - self.allowed_lateness_us
+        if source_watermark_us is None or watermark_us > source_watermark_us:
+            self.advance_watermark(source, watermark_us)
+
+    def advance_watermark(self, source: str, watermark_us: int):
+        """
+        Move the watermark of a source forward and close its open bars ending at or before it
+        """
+        self.watermarks[source] = watermark_us
+        close_heap = self.close_heaps.get(source, [])
+        while close_heap and close_heap[0][0] <= watermark_us:
+            _, key = heapq.heappop(close_heap)
+            bar = self.open_bars.pop(key)
+            bar.finalise()
+            self.closed_bars.append(bar)
+
+    def close_source(self, source: str, partial: bool=False):
+        """
+        Close all open bars of a source. Later events for these bars are counted as late
+        """
+        close_heap = self.close_heaps.pop(source, [])
+        for end_us, key in close_heap:
+            bar = self.open_bars.pop(key)
+            bar.finalise(partial)
+            self.closed_bars.append(bar)
+            idle_key = (source, bar.interval_s)
+            if end_us > self.idle_closed.get(idle_key, 0):
+                self.idle_closed[idle_key] = end_us
+
+    def close_idle_sources(self):
+        """
+        Close the open bars of sources without events for idle_timeout_s
+        Their watermark will not move until the next event, which would otherwise keep the bars open
+        """
+        now = self.clock()
+        for source, close_heap in list(self.close_heaps.items()):
+            if close_heap and now - self.source_last_seen[source] > self.idle_timeout_s:
+                logger.info(f'Closing {len(close_heap)} {self.event_type} bars of idle source {source}')
+                self.close_source(source)
+
+    def close_all(self):
+        """
+        Close all open bars as partial bars, eg. on shutdown
+        """
+        for source in list(self.close_heaps):
+            self.close_source(source, partial=True)
+
+    def drain(self) -> list[Bar]:
+        """
+        Return and clear the closed bars waiting to be saved
+        """
+        bars, self.closed_bars = self.closed_bars, []
+        return bars
+
+
+def bars_to_table(bars: list[Bar], event_type: str) -> pa.Table:
+    """
+    Convert closed bars to a table, computing VWAP / TWAP vectorised with NumPy
+    """
+    n = len(bars)
+
+    def column(attr, dtype):
+        return np.fromiter((getattr(bar, attr) for bar in bars), dtype=dtype, count=n)
+
+    ts_type = pa.timestamp('us', tz=constants.NY_TZ.zone)
+    start_us = column('start_us', np.int64)
+    bar_start = pa.array(start_us, type=pa.timestamp('us', tz='UTC')).cast(ts_type)
+    columns = {
+        'event_type': pa.array([event_type] * n, type=pa.string()),
+        'interval_s': column('interval_s', np.int64),
+        'date': pc.strftime(bar_start, format='%Y-%m-%d'),
+        'symbol': pa.array([bar.symbol for bar in bars], type=pa.string()),
+        'source': pa.array([bar.source for bar in bars], type=pa.string()),
+        'asset_type': pa.array([bar.asset_type for bar in bars], type=pa.string()),
+        'bar_start': bar_start,
+        'bar_end': pa.array(column('end_us', np.int64), type=pa.timestamp('us', tz='UTC')).cast(ts_type),
+        'open': column('open', np.float64),
+        'high': column('high', np.float64),
+        'low': column('low', np.float64),
+        'close': column('close', np.float64),
+        'count': column('count', np.int64),
+        'partial': pa.array([bar.partial for bar in bars], type=pa.bool_()),
+    }
+    if event_type == EVENT_TYPE_TRADE:
+        volume = column('volume', np.float64)
+        columns['volume'] = volume
+        columns['vwap'] = np.divide(column('pv', np.float64), volume, out=columns['close'].copy(), where=volume > 0)
+    else:
+        tw_us = column('tw_us', np.float64)
+        columns['twap'] = np.divide(column('tw_sum', np.float64), tw_us, out=columns['close'].copy(), where=tw_us > 0)
+    return pa.table(columns)
+
+
+def save_bars_to_parquet(bars: list[Bar], pq_dir: str, event_type: str):
+    """
+    Save closed bars to Parquet files partitioned by event type, interval and date
+    Eg. <pq_dir>/event_type=trade/interval_s=60/date=2026-02-13/bars_20260213_130922_668051_0.parquet
+    """
+    if not bars:
+        logger.info('No closed bars, skipping save')
+        return
+    table = bars_to_table(bars, event_type)
+    os.makedirs(pq_dir, exist_ok=True)
+    timestamp = dtt.now(constants.NY_TZ).strftime("%Y%m%d_%H%M%S_%f")
+    pq.write_to_dataset(table, root_path=pq_dir, partition_cols=['event_type', 'interval_s', 'date'],
+                        basename_template=f'bars_{timestamp}_{{i}}.parquet', compression='snappy')
+    logger.info(f'Successfully saved {len(bars)} {event_type} bars to {pq_dir}')
+
+
+async def aggregate_queue(queue, aggregator: BarAggregator, pq_dir: str='src/data/bars/', flush_size: int=500,
+                          max_age_s: float=60.0):
+    """
+    Continuously consumes messages from a queue into the aggregator
+    Closed bars are saved in batches once flush_size closed bars are pending, or once the oldest pending
+    closed bar has waited max_age_s. Open bars of idle sources are closed, checked at least every idle_timeout_s.
+    When the task is cancelled the pending closed bars and the open bars, flagged as partial, are saved
+    """
+    logger.info(f'Aggregating bars for {aggregator.event_type}')
+    loop = asyncio.get_running_loop()
+    pending_since = None
+    try:
+        while True:
+            timeout = None if pending_since is None else max(pending_since + max_age_s - loop.time(), 0)
+            if aggregator.open_bars and (timeout is None or timeout > aggregator.idle_timeout_s):
+                timeout = aggregator.idle_timeout_s
+            try:
+                msg = await asyncio.wait_for(queue.get(), timeout=timeout)
+            except asyncio.TimeoutError:
+                msg = None
+
+            if msg is not None:
+                try:
+                    data = msg['market_feed']
+                    if data is None:
+                        logger.info('Skipping empty message')
+                    else:
+                        aggregator.update(data)
+                except Exception as e:
+                    logger.error(f'Error aggregating bars {e}')
+                finally:
+                    queue.task_done()
+            aggregator.close_idle_sources()
+
+            if not aggregator.closed_bars:
+                continue
+            if pending_since is None:
+                pending_since = loop.time()
+            if len(aggregator.closed_bars) >= flush_size or loop.time() - pending_since >= max_age_s:
+                logger.info(f'Saving {len(aggregator.closed_bars)} closed bars, pending for '
+                            f'{loop.time() - pending_since:.1f}s. Late events so far: {aggregator.late_events}')
+                pending_since = None
+                try:
+                    await asyncio.to_thread(save_bars_to_parquet, aggregator.drain(), pq_dir, aggregator.event_type)
+                except Exception as e:
+                    logger.error(f'Error saving bars {e}')
+    except asyncio.CancelledError:
+        aggregator.close_all()
+        if aggregator.closed_bars:
+            logger.info(f'Saving {len(aggregator.closed_bars)} pending and partial {aggregator.event_type} bars '
+                        f'on shutdown')
+            save_bars_to_parquet(aggregator.drain(), pq_dir, aggregator.event_type)
+        raise
+
+
+async def run_bar_aggregator(intervals_s: tuple=(1, 60), allowed_lateness_s: float=1.0):
+    """
+    Runs bar aggregators concurrently for trade, quote and reference price events
+    Each aggregator consumes its own subscription to the messages published by the consolidator
+    """
+    logger.info(f'Running bar aggregator for intervals {intervals_s}')
+    event_types = (EVENT_TYPE_TRADE, EVENT_TYPE_QUOTE, EVENT_TYPE_REF_PX)
+    queues = {event_type: subscribe(event_type) for event_type in event_types}
+    try:
+        await asyncio.gather(*[
+            aggregate_queue(queues[event_type], BarAggregator(event_type, intervals_s, allowed_lateness_s))
+            for event_type in event_types
+        ])
+    finally:
+        for event_type, queue in queues.items():
+            unsubscribe(event_type, queue)
@@ -0,0 +1,289 @@
+"""
+Consolidated Best Bid / Offer (BBO) Engine Module
+
+Combines quotes of the same symbol from several venues (exchanges, or the source when a quote has no
+exchange) into a consolidated best bid and best ask. Uses asyncio for asynchronous processing.
+
+Key features:
+- Keeps the latest top-of-book per venue for each symbol
+- Best bid and ask across venues are kept in indexed heaps, so a venue update is O(log venues)
+- Venue quotes older than stale_after_s in event time are expired from the book. Each venue has one entry in
+  the expiry heap, rescheduled when it pops after the venue was refreshed
+- Venue updates older than the venue's current quote are ignored
+- A consolidated quote is emitted to bbo_queue whenever the BBO changes. The consolidator saves it to
+  Parquet and publishes it to the in-process subscribers of the bbo event type
+"""
+import heapq
+from datetime import datetime as dtt
+
+from src.constants import NY_TZ, EVENT_TYPE_QUOTE, EVENT_TYPE_BBO, SOURCE_BBO
+from src.core.queue_manager import bbo_queue, subscribe, unsubscribe
+from src.logger import get_logger
+from src.utils import to_epoch_us
+
+logger = get_logger(__name__)
+
+
+class IndexedHeap:
+    """
+    Binary min-heap of (priority, key) with a position index so an entry can be updated or removed by key
+    """
+    def __init__(self):
+        self.heap = []
+        self.pos = {}
+
+    def __len__(self):
+        return len(self.heap)
+
+    def __contains__(self, key):
+        return key in self.pos
+
+    def peek(self):
+        """
+        Key of the entry with the lowest priority, None if the heap is empty
+        """
+        return self.heap[0][1] if self.heap else None
+
+    def push(self, key, priority):
+        """
+        Insert an entry, or update the priority of an existing entry
+        """
+        if key in self.pos:
+            i = self.pos[key]
+            old_priority = self.heap[i][0]
+            self.heap[i] = (priority, key)
+            if priority < old_priority:
+                self._sift_up(i)
+            else:
+                self._sift_down(i)
+            return
+        self.heap.append((priority, key))
+        self.pos[key] = len(self.heap) - 1
+        self._sift_up(len(self.heap) - 1)
+
+    def remove(self, key):
+        """
+        Remove an entry by key, ignoring keys which are not in the heap
+        """
+        i = self.pos.pop(key, None)
+        if i is None:
+            return
+        last = self.heap.pop()
+        if i < len(self.heap):
+            self.heap[i] = last
+            self.pos[last[1]] = i
+            self._sift_up(i)
+            self._sift_down(self.pos[last[1]])
+
+    def _sift_up(self, i):
+        heap, pos = self.heap, self.pos
+        entry = heap[i]
+        while i > 0:
+            parent = (i - 1) >> 1
+            parent_entry = heap[parent]
+            if entry[0] >= parent_entry[0]:
+                break
+            heap[i] = parent_entry
+            pos[parent_entry[1]] = i
+            i = parent
+        heap[i] = entry
+        pos[entry[1]] = i
+
+    def _sift_down(self, i):
+        heap, pos = self.heap, self.pos
+        n = len(heap)
+        entry = heap[i]
+        child = 2 * i + 1
+        while child < n:
+            right = child + 1
+            if right < n and heap[right][0] < heap[child][0]:
+                child = right
+            child_entry = heap[child]
+            if child_entry[0] >= entry[0]:
+                break
+            heap[i] = child_entry
+            pos[child_entry[1]] = i
+            i = child
+            child = 2 * i + 1
+        heap[i] = entry
+        pos[entry[1]] = i
+
+
+class SymbolBook:
+    """
+    Top-of-book of every venue quoting a symbol, with bids and asks ranked across venues
+    Bids rank by highest price, asks by lowest price, ties go to the venue which quoted the price first
+    """
+    def __init__(self, symbol: str, asset_type: str|None):
+        self.symbol = symbol
+        self.asset_type = asset_type
+        self.quotes = {}
+        self.bids = IndexedHeap()
+        self.asks = IndexedHeap()
+        self.last_bbo = None
+
+    def update(self, venue: str, bid: float|None, bid_size: float|None, ask: float|None, ask_size: float|None,
+               event_us: int):
+        previous = self.quotes.get(venue)
+        self.quotes[venue] = (bid, bid_size, ask, ask_size, event_us)
+        if bid is None:
+            self.bids.remove(venue)
+        elif previous is None or previous[0] != bid:
+            self.bids.push(venue, (-bid, event_us))
+        if ask is None:
+            self.asks.remove(venue)
+        elif previous is None or previous[2] != ask:
+            self.asks.push(venue, (ask, event_us))
+
+    def remove(self, venue: str):
+        self.quotes.pop(venue, None)
+        self.bids.remove(venue)
+        self.asks.remove(venue)
+
+    def get_bbo(self) -> tuple:
+        """
+        Returns:
+            tuple: (bid, bid_size, bid_venue, ask, ask_size, ask_venue), None fields for an empty side
+        """
+        bid_venue, ask_venue = self.bids.peek(), self.asks.peek()
+        bid, bid_size = self.quotes[bid_venue][:2] if bid_venue is not None else (None, None)
+        ask, ask_size = self.quotes[ask_venue][2:4] if ask_venue is not None else (None, None)
+        return bid, bid_size, bid_venue, ask, ask_size, ask_venue
+
+
+class BBOEngine:
+    """
+    Maintains the consolidated BBO of every symbol from normalised quote events
+
+    Args:
+        stale_after_s: Seconds of event time after which a venue quote which was not updated is expired
+    """
+    def __init__(self, stale_after_s: float=10.0):
+        self.stale_after_us = int(stale_after_s * 1_000_000)
+        self.books = {}
+        self.expiry_heap = []
+        self.now_us = None
+
+    def update(self, data: dict, created_at: dtt|None=None) -> list[dict]:
+        """
+        Apply a quote event and expire stale venues
+
+        Args:
+            data: Normalised quote event
+            created_at: Creation time of the emitted consolidated quotes, defaults to now
+        Returns:
+            list: Consolidated quotes for every symbol whose BBO changed
+        """
+        symbol = data['symbol']
+        venue = data.get('exchange') or data['source']
+        event_us = to_epoch_us(data['event_time'])
+
+        book = self.books.get(symbol)
+        if book is None:
+            book = self.books[symbol] = SymbolBook(symbol, data.get('asset_type'))
+        previous = book.quotes.get(venue)
+        if previous is not None and event_us < previous[4]:
+            logger.debug(f'Ignoring {venue} quote for {symbol} older than the current venue quote')
+            return []
+        if self.now_us is None or event_us > self.now_us:
+            self.now_us = event_us
+
+        book.update(venue, data.get('bid'), data.get('bid_size'), data.get('ask'), data.get('ask_size'), event_us)
+        if previous is None:
+            heapq.heappush(self.expiry_heap, (event_us + self.stale_after_us, symbol, venue))
+
+        changed = self.expire() if self.expiry_heap[0][0] <= self.now_us else {}
+        changed[symbol] = book
+        bbos = []
+        for changed_book in changed.values():
+            bbo = changed_book.get_bbo()
+            if bbo == changed_book.last_bbo:
+                continue
+            changed_book.last_bbo = bbo
+            if created_at is None:
+                created_at = dtt.now(NY_TZ)
+            bbos.append(make_bbo_event(changed_book.symbol, changed_book.asset_type, bbo, len(changed_book.quotes),
+                                       data['event_time'], created_at))
+        return bbos
+
+    def expire(self) -> dict:
+        """
+        Remove venue quotes which have not been updated for stale_after_s before now_us
+        Entries of venues refreshed since they were scheduled are rescheduled from the latest venue quote
+
+        Returns:
+            dict: Symbol to book of the symbols with expired venues
+        """
+        expired = {}
+        while self.expiry_heap and self.expiry_heap[0][0] <= self.now_us:
+            _, symbol, venue = heapq.heappop(self.expiry_heap)
+            book = self.books[symbol]
+            quote = book.quotes.get(venue)
+            if quote is None:
+                continue
+            expiry_us = quote[4] + self.stale_after_us
+            if expiry_us > self.now_us:
+                heapq.heappush(self.expiry_heap, (expiry_us, symbol, venue))
+                continue
+            logger.debug(f'Expiring stale {venue} quote for {symbol}')
+            book.remove(venue)
+            expired[symbol] = book
+        return expired
+
+
+def make_bbo_event(symbol: str, asset_type: str|None, bbo: tuple, num_venues: int, event_time: dtt,
+                   created_at: dtt) -> dict:
+    """
+    Build the consolidated quote event of a BBO as returned by SymbolBook.get_bbo
+    """
+    bid, bid_size, bid_venue, ask, ask_size, ask_venue = bbo
+    return {
+        'asset_type': asset_type,
+        'event_type': EVENT_TYPE_BBO,
+        'symbol': symbol,
+        'bid_size': bid_size,
+        'ask_size': ask_size,
+        'bid': bid,
+        'ask': ask,
+        'mid': (bid + ask) / 2 if bid is not None and ask is not None else None,
+        'bid_exchange': bid_venue,
+        'ask_exchange': ask_venue,
+        'num_venues': num_venues,
+        'event_time': event_time,
+        'vendor': None,
+        'source': SOURCE_BBO,
+        'exchange': None,
+        'created_at': created_at
+    }
+
+
+async def run_bbo_engine(stale_after_s: float=10.0, max_batch_size: int=500):
+    """
+    Consumes quotes published by the consolidator and pushes consolidated quotes into bbo_queue
+    Quotes already waiting in the subscription are processed as a batch sharing one created_at
+    The message is wrapped in a dictionary with the key market_feed
+    so that the consolidator processes it consistently with other market feeds
+    """
+    logger.info(f'Running BBO engine')
+    engine = BBOEngine(stale_after_s=stale_after_s)
+    queue = subscribe(EVENT_TYPE_QUOTE)
+    try:
+        while True:
+            batch = [await queue.get()]
+            while not queue.empty() and len(batch) < max_batch_size:
+                batch.append(queue.get_nowait())
+            created_at = dtt.now(NY_TZ)
+            for msg in batch:
+                try:
+                    data = msg['market_feed']
+                    if data is None:
+                        continue
+                    for bbo in engine.update(data, created_at):
+                        logger.debug(f'bbo:{bbo}')
+                        await bbo_queue.put({'market_feed': bbo})
+                except Exception as e:
+                    logger.error(f'Error updating BBO {e}')
+                finally:
+                    queue.task_done()
+    finally:
+        unsubscribe(EVENT_TYPE_QUOTE, queue)
@@ -0,0 +1,105 @@
+"""
+Event Reorderer Module
+
+Reorders events arriving out of order from different connections and sources so that they are
+emitted in event_time order. Events are held in a heap until the watermark passes them.
+
+Watermarks:
+- Each source has its own watermark: the maximum event_time seen from it minus the allowed lateness
+- The emitted watermark is the minimum over the active sources. Sources without events for idle_timeout_s
+  do not hold it back, and once every source is idle all pending events are emitted
+- Events older than the emitted watermark can no longer be emitted in order. They are counted and
+  returned separately as late events
+"""
+import heapq
+import itertools
+import time
+from typing import Callable
+
+from src.logger import get_logger
+from src.utils import to_epoch_us
+
+logger = get_logger(__name__)
+
+
+class EventReorderer:
+    """
+    Buffers normalised events and emits them in event_time order
+
+    Args:
+        allowed_lateness_s: Seconds each source watermark lags the maximum event_time seen from the source
+        idle_timeout_s: Seconds without events after which a source no longer holds back the watermark
+        max_pending: Maximum number of held events, the oldest events are emitted early beyond this
+        clock: Monotonic clock in seconds used for idle detection
+    """
+    def __init__(self, allowed_lateness_s: float=2.0, idle_timeout_s: float=5.0, max_pending: int=100_000,
+                 clock: Callable[[], float]=time.monotonic):
+        self.allowed_lateness_us = int(allowed_lateness_s * 1_000_000)
+        self.idle_timeout_s = idle_timeout_s
+        self.max_pending = max_pending
+        self.clock = clock
+        self.heap = []
+        self.seq = itertools.count()
+        self.source_max_us = {}
+        self.source_last_seen = {}
+        self.watermark_us = None
+        self.late_events = 0
+
+    def push(self, data: dict) -> tuple[list, list]:
+        """
+        Add an event and emit all events which are now behind the watermark
+
+        Returns:
+            tuple: Events ready to be emitted in event_time order, and late events
+        """
+        event_us = to_epoch_us(data['event_time'])
+        if self.watermark_us is not None and event_us < self.watermark_us:
+            self.late_events += 1
+            logger.debug(f'Late event {event_us} behind watermark {self.watermark_us}: {data}')
+            return self.pop_ready(), [data]
+
+        source = data['source']
+        if source not in self.source_max_us or event_us > self.source_max_us[source]:
+            self.source_max_us[source] = event_us
+        self.source_last_seen[source] = self.clock()
+        heapq.heappush(self.heap, (event_us, next(self.seq), data))
+        return self.pop_ready(), []
+
+    def get_watermark(self) -> int|None:
+        """
+        Minimum watermark over the active sources, or the maximum event_time seen once every source is idle
+        """
+        if not self.source_max_us:
+            return None
+        now = self.clock()
+        active = [max_us - self.allowed_lateness_us for source, max_us in self.source_max_us.items()
+                  if now - self.source_last_seen[source] <= self.idle_timeout_s]
+        return min(active) if active else max(self.source_max_us.values())
+
+    def pop_ready(self) -> list:
+        """
+        Advance the watermark and pop the events behind it in event_time order
+        """
+        watermark_us = self.get_watermark()
+        if watermark_us is not None and (self.watermark_us is None or watermark_us > self.watermark_us):
+            self.watermark_us = watermark_us
+
+        ready = []
+        while self.heap and (self.heap[0][0] <= self.watermark_us or len(self.heap) > self.max_pending):
+            event_us, _, data = heapq.heappop(self.heap)
+            if event_us > self.watermark_us:
+                # Emitted early due to max_pending, anything older is now late
+                self.watermark_us = event_us
+            ready.append(data)
+        return ready
+
+    def flush(self) -> list:
+        """
+        Pop all pending events in event_time order regardless of the watermark
+        """
+        ready = [heapq.heappop(self.heap)[2] for _ in range(len(self.heap))]
+        if ready:
+            last_us = to_epoch_us(ready[-1]['event_time'])
+            if self.watermark_us is None or last_us > self.watermark_us:
+                self.watermark_us = last_us
+        return ready
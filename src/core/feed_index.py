@@ -0,0 +1,276 @@
+"""
+Consolidated Feeds Index Module
+
+Maintains a sidecar JSON index next to the consolidated feeds Parquet files.
+For every file and row group the index records the event_time range, the symbols
+and the sources it contains, so that point queries can skip whole files and row
+groups without opening them.
+
+One index is kept per event type as a JSON snapshot (eg. _consol_feeds_index_trade.json)
+written by rebuild_index and compact_index, plus an append-only log of newly written files
+(_consol_feeds_index_trade.jsonl), so that indexing a new file does not rewrite the
+snapshot. Once the log passes INDEX_LOG_COMPACT_BYTES it is compacted
+into the snapshot. Files starting with an underscore are ignored by pyarrow dataset discovery.
+
+Indexes returned by load_index are never changed afterwards, new log lines are applied to a
+copy, so queries can use them while files are being indexed from another thread.
+"""
+import glob
+import json
+import os
+import threading
+from datetime import datetime as dtt
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+from src.logger import get_logger
+from src.utils import to_epoch_us
+
+logger = get_logger(__name__)
+
+INDEX_VERSION = 1
+INDEX_LOG_COMPACT_BYTES = 1024 * 1024
+
+_index_cache = {}
+_index_lock = threading.RLock()
+
+
+def get_index_fp(pq_dir: str, event_type: str) -> str:
+    """
+    Path of the sidecar index snapshot for an event type
+    """
+    return os.path.join(pq_dir, f'_consol_feeds_index_{event_type}.json')
+
+
+def get_index_log_fp(pq_dir: str, event_type: str) -> str:
+    """
+    Path of the append-only log of files indexed since the last snapshot
+    """
+    return os.path.join(pq_dir, f'_consol_feeds_index_{event_type}.jsonl')
+
+
+def _event_time_range(event_times: pa.ChunkedArray) -> tuple[int|None, int|None]:
+    """
+    Min and max event_time of a column in epoch microseconds, None if the column is not a timestamp
+    """
+    if not pa.types.is_timestamp(event_times.type) or event_times.null_count == len(event_times):
+        return None, None
+    epoch_us = pc.cast(pc.cast(event_times, pa.timestamp('us', tz='UTC')), pa.int64())
+    min_max = pc.min_max(epoch_us).as_py()
+    return min_max['min'], min_max['max']
+
+
+def _unique_strs(table: pa.Table, column: str) -> list:
+    if column not in table.column_names:
+        return []
+    return sorted(str(val) for val in pc.unique(table[column]).to_pylist() if val is not None)
+
+
+def build_row_group_entries(table: pa.Table, row_group_sizes: list[int]) -> list[dict]:
+    """
+    Build index entries for a table written with the given row group sizes
+
+    Args:
+        table: Table as written to the Parquet file
+        row_group_sizes: Number of rows in each row group, in file order
+    Returns:
+        list: One entry per row group with event_time range, symbols and sources
+    """
+    entries = []
+    offset = 0
+    for rg_id, num_rows in enumerate(row_group_sizes):
+        rg_table = table.slice(offset, num_rows)
+        offset += num_rows
+        min_time, max_time = _event_time_range(rg_table['event_time']) \
+            if 'event_time' in rg_table.column_names else (None, None)
+        entries.append({
+            'id': rg_id,
+            'num_rows': num_rows,
+            'min_event_time': min_time,
+            'max_event_time': max_time,
+            'symbols': _unique_strs(rg_table, 'symbol'),
+            'sources': _unique_strs(rg_table, 'source'),
+        })
+    return entries
+
+
+def index_parquet_file(pq_fp: str) -> list[dict]:
+    """
+    Build index entries for an existing Parquet file by reading its symbol, source and event_time columns
+    """
+    pq_file = pq.ParquetFile(pq_fp)
+    columns = [col for col in ('symbol', 'source', 'event_time') if col in pq_file.schema_arrow.names]
+    table = pq_file.read(columns=columns)
+    row_group_sizes = [pq_file.metadata.row_group(i).num_rows for i in range(pq_file.num_row_groups)]
+    return build_row_group_entries(table, row_group_sizes)
+
+
+def _mtime_ns(fp: str) -> int|None:
+    try:
+        return os.stat(fp).st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+
+def _read_log(log_fp: str, offset: int) -> tuple[dict, int]:
+    """
+    Read the complete log lines after offset
+
+    Returns:
+        tuple: File name to index entry of the lines read, offset after the last complete line
+    """
+    try:
+        with open(log_fp, 'rb') as f:
+            f.seek(offset)
+            data = f.read()
+    except FileNotFoundError:
+        return {}, 0
+    # A line still being appended by the writer is read on the next load
+    end = data.rfind(b'\n') + 1
+    files = {}
+    for line in data[:end].splitlines():
+        if line.strip():
+            entry = json.loads(line)
+            files[entry['file']] = {'row_groups': entry['row_groups']}
+    return files, offset + end
+
+
+def load_index(pq_dir: str, event_type: str) -> dict:
+    """
+    Load the sidecar index of an event type
+    The cached index is kept until the snapshot changes. Lines appended to the log since are applied to a copy
+    which replaces the cached index, so an index already returned is never changed
+    """
+    index_fp = get_index_fp(pq_dir, event_type)
+    log_fp = get_index_log_fp(pq_dir, event_type)
+    with _index_lock:
+        mtime = _mtime_ns(index_fp)
+        log_size = os.path.getsize(log_fp) if os.path.exists(log_fp) else 0
+
+        cached = _index_cache.get(index_fp)
+        if cached and cached['mtime'] == mtime and cached['offset'] <= log_size:
+            if cached['offset'] < log_size:
+                new_files, offset = _read_log(log_fp, cached['offset'])
+                if new_files:
+                    index = {**cached['index'], 'files': {**cached['index']['files'], **new_files}}
+                    _index_cache[index_fp] = {'mtime': mtime, 'offset': offset, 'index': index}
+                else:
+                    cached['offset'] = offset
+            return _index_cache[index_fp]['index']
+
+        index = {'version': INDEX_VERSION, 'files': {}}
+        if mtime is not None:
+            with open(index_fp) as f:
+                index = json.load(f)
+        new_files, offset = _read_log(log_fp, 0)
+        index['files'].update(new_files)
+        _index_cache[index_fp] = {'mtime': mtime, 'offset': offset, 'index': index}
+        return index
+
+
+def write_index(index: dict, pq_dir: str, event_type: str):
+    """
+    Atomically persist the sidecar index snapshot so concurrent readers never see a partial file
+    The log is removed, its entries are part of the snapshot
+    """
+    os.makedirs(pq_dir, exist_ok=True)
+    index_fp = get_index_fp(pq_dir, event_type)
+    tmp_fp = f'{index_fp}.tmp'
+    with _index_lock:
+        with open(tmp_fp, 'w') as f:
+            json.dump(index, f, separators=(',', ':'))
+        os.replace(tmp_fp, index_fp)
+        try:
+            os.remove(get_index_log_fp(pq_dir, event_type))
+        except FileNotFoundError:
+            pass
+
+
+def add_file_to_index(pq_dir: str, event_type: str, pq_fp: str, row_groups: list[dict]):
+    """
+    Record the row groups of a newly written Parquet file by appending a line to the index log
+    The log is compacted into the snapshot once it passes INDEX_LOG_COMPACT_BYTES
+    """
+    os.makedirs(pq_dir, exist_ok=True)
+    log_fp = get_index_log_fp(pq_dir, event_type)
+    line = json.dumps({'file': os.path.basename(pq_fp), 'row_groups': row_groups}, separators=(',', ':'))
+    with _index_lock:
+        with open(log_fp, 'a') as f:
+            f.write(line + '\n')
+            log_size = f.tell()
+    # Refreshes the cache with the appended line only
+    load_index(pq_dir, event_type)
+    logger.debug(f'Indexed {len(row_groups)} row groups of {pq_fp}')
+    if log_size >= INDEX_LOG_COMPACT_BYTES:
+        compact_index(pq_dir, event_type)
+
+
+def compact_index(pq_dir: str, event_type: str) -> dict:
+    """
+    Write the index with its log entries as the new snapshot and remove the log
+    Files no longer present in pq_dir are dropped from the index
+    """
+    index_fp = get_index_fp(pq_dir, event_type)
+    with _index_lock:
+        index = load_index(pq_dir, event_type)
+        files = {file_name: file_entry for file_name, file_entry in index['files'].items()
+                 if os.path.exists(os.path.join(pq_dir, file_name))}
+        index = {**index, 'files': files}
+        write_index(index, pq_dir, event_type)
+        _index_cache[index_fp] = {'mtime': _mtime_ns(index_fp), 'offset': 0, 'index': index}
+    logger.info(f'Compacted consolidated feeds index for {event_type} in {pq_dir}, {len(files)} files')
+    return index
+
+
+def rebuild_index(pq_dir: str, event_type: str) -> dict:
+    """
+    Rebuild the sidecar index of an event type from all Parquet files present in pq_dir
+    """
+    logger.info(f'Rebuilding consolidated feeds index for {event_type} in {pq_dir}')
+    files = {}
+    for pq_fp in sorted(glob.glob(os.path.join(pq_dir, f'consol_feeds_{event_type}_*.parquet'))):
+        files[os.path.basename(pq_fp)] = {'row_groups': index_parquet_file(pq_fp)}
+    index = {'version': INDEX_VERSION, 'files': files}
+    write_index(index, pq_dir, event_type)
+    return index
+
+
+def _row_group_matches(row_group: dict, start_us: int|None, end_us: int|None,
+                       symbols: set|None, source: str|None) -> bool:
+    if symbols is not None and symbols.isdisjoint(row_group['symbols']):
+        return False
+    if source is not None and source not in row_group['sources']:
+        return False
+    min_time, max_time = row_group['min_event_time'], row_group['max_event_time']
+    if start_us is not None and max_time is not None and max_time < start_us:
+        return False
+    if end_us is not None and min_time is not None and min_time > end_us:
+        return False
+    return True
+
+
+def lookup_row_groups(index: dict, start: dtt|None=None, end: dtt|None=None,
+                      symbols: list|None=None, source: str|None=None) -> dict[str, list[int]]:
+    """
+    Find the files and row groups of the index which may contain matching events
+
+    Args:
+        index: Sidecar index as returned by load_index
+        start: Inclusive lower bound on event_time
+        end: Inclusive upper bound on event_time
+        symbols: Symbols to match, None matches all symbols
+        source: Source to match, None matches all sources
+    Returns:
+        dict: File name to list of candidate row group ids. Files without candidates are omitted
+    """
+    start_us = to_epoch_us(start) if start is not None else None
+    end_us = to_epoch_us(end) if end is not None else None
+    symbols = set(symbols) if symbols else None
+    matches = {}
+    for file_name, file_entry in index.get('files', {}).items():
+        row_groups = [rg['id'] for rg in file_entry['row_groups']
+                      if _row_group_matches(rg, start_us, end_us, symbols, source)]
+        if row_groups:
+            matches[file_name] = row_groups
+    return matches
@@ -0,0 +1,155 @@
+"""
+Consolidated Feeds Query Module
+
+Reads consolidated feeds Parquet files back through pyarrow.dataset without loading them whole.
+
+Key features:
+- Partition pruning on the event type encoded in the consolidated feeds file names
+- Sidecar index lookup to skip files and row groups which cannot match a symbol / time range / source
+- Row-group statistics pushdown of the event_time, symbol and source filters
+- Streams results as record batches, serialised as Arrow IPC stream or NDJSON
+"""
+import glob
+import io
+import json
+import os
+from datetime import datetime as dtt, date, time as dt_time
+from typing import Iterator
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.fs as pafs
+
+from src.core.feed_index import load_index, lookup_row_groups
+from src.logger import get_logger
+from src.utils import convert_dt_to_tz
+
+logger = get_logger(__name__)
+
+BATCH_SIZE = 10_000
+
+
+def build_filter(start: dtt|None=None, end: dtt|None=None, symbols: list|None=None,
+                 source: str|None=None) -> ds.Expression|None:
+    """
+    Build the dataset filter expression pushed down to the Parquet row-group statistics
+    """
+    conditions = []
+    if start is not None:
+        conditions.append(ds.field('event_time') >= pa.scalar(convert_dt_to_tz(start)))
+    if end is not None:
+        conditions.append(ds.field('event_time') <= pa.scalar(convert_dt_to_tz(end)))
+    if symbols:
+        conditions.append(ds.field('symbol').isin(symbols))
+    if source is not None:
+        conditions.append(ds.field('source') == source)
+    if not conditions:
+        return None
+    expr = conditions[0]
+    for condition in conditions[1:]:
+        expr = expr & condition
+    return expr
+
+
+def get_fragments(pq_dir: str, event_type: str, start: dtt|None=None, end: dtt|None=None,
+                  symbols: list|None=None, source: str|None=None) -> list[ds.ParquetFileFragment]:
+    """
+    Select the Parquet fragments which may contain matching events
+    Only files of the requested event type are considered. Indexed files are restricted to their candidate
+    row groups and skipped entirely when none match. Files missing from the index are scanned whole
+
+    Returns:
+        list: Parquet file fragments restricted to candidate row groups
+    """
+    file_format = ds.ParquetFileFormat()
+    filesystem = pafs.LocalFileSystem()
+    index = load_index(pq_dir, event_type)
+    candidates = lookup_row_groups(index, start=start, end=end, symbols=symbols, source=source)
+    indexed_files = index.get('files', {})
+
+    fragments = []
+    skipped = 0
+    for pq_fp in sorted(glob.glob(os.path.join(pq_dir, f'consol_feeds_{event_type}_*.parquet'))):
+        pq_fp = os.path.abspath(pq_fp)
+        file_name = os.path.basename(pq_fp)
+        if file_name not in indexed_files:
+            fragments.append(file_format.make_fragment(pq_fp, filesystem=filesystem))
+        elif file_name in candidates:
+            fragments.append(file_format.make_fragment(pq_fp, filesystem=filesystem,
+                                                       row_groups=candidates[file_name]))
+        else:
+            skipped += 1
+    logger.info(f'Querying {len(fragments)} {event_type} files, skipped {skipped} files using index')
+    return fragments
+
+
+def get_dataset(fragments: list[ds.ParquetFileFragment]) -> ds.FileSystemDataset:
+    """
+    Build a dataset over the fragments with a schema unified across files.
+    Columns that are entirely null in some files (eg. exchange) are promoted to the type used elsewhere
+    """
+    schema = pa.unify_schemas([fragment.physical_schema for fragment in fragments], promote_options='permissive')
+    return ds.FileSystemDataset(fragments, schema, ds.ParquetFileFormat(), pafs.LocalFileSystem())
+
+
+def query_feeds(event_type: str, start: dtt|None=None, end: dtt|None=None, symbols: list|None=None,
+                source: str|None=None, columns: list|None=None, pq_dir: str='src/data/consol_feeds/',
+                batch_size: int=BATCH_SIZE) -> tuple[pa.Schema, Iterator[pa.RecordBatch]]:
+    """
+    Query consolidated feeds by time range, symbols and source
+
+    Args:
+        event_type: Event type of the consolidated feeds (trade, quote, ref_px)
+        start: Inclusive lower bound on event_time, naive datetimes are treated as UTC
+        end: Inclusive upper bound on event_time, naive datetimes are treated as UTC
+        symbols: Symbols to return, None returns all symbols
+        source: Source to return (eg. tiingo_crypto), None returns all sources
+        columns: Columns to return, None returns all columns. Raises ValueError for unknown columns
+        pq_dir: Directory of the consolidated feeds Parquet files
+        batch_size: Maximum number of rows per record batch
+    Returns:
+        tuple: Result schema and an iterator of record batches, read lazily
+    """
+    fragments = get_fragments(pq_dir, event_type, start=start, end=end, symbols=symbols, source=source)
+    if not fragments:
+        return pa.schema([]), iter(())
+
+    dataset = get_dataset(fragments)
+    if columns is not None:
+        unknown_columns = [col for col in columns if col not in dataset.schema.names]
+        if unknown_columns:
+            raise ValueError(f'Unknown columns {unknown_columns}')
+    scanner = dataset.scanner(columns=columns, batch_size=batch_size,
+                              filter=build_filter(start=start, end=end, symbols=symbols, source=source))
+    return scanner.projected_schema, (batch for batch in scanner.to_batches() if batch.num_rows)
+
+
+def stream_arrow_ipc(schema: pa.Schema, batches: Iterator[pa.RecordBatch]) -> Iterator[bytes]:
+    """
+    Serialise record batches to an Arrow IPC stream, yielding bytes as each batch is written
+    """
+    sink = io.BytesIO()
+    with pa.ipc.new_stream(sink, schema) as writer:
+        for batch in batches:
+            writer.write_batch(batch)
+            yield sink.getvalue()
+            sink.seek(0)
+            sink.truncate()
+    yield sink.getvalue()
+
+
+def _json_default(value):
+    """
+    Serialise datetimes as ISO 8601, other non JSON values as strings
+    """
+    if isinstance(value, (date, dt_time)):
+        return value.isoformat()
+    return str(value)
+
+
+def stream_ndjson(batches: Iterator[pa.RecordBatch]) -> Iterator[bytes]:
+    """
+    Serialise record batches to newline delimited JSON, yielding one chunk per batch
+    """
+    for batch in batches:
+        lines = [json.dumps(row, default=_json_default) for row in batch.to_pylist()]
+        yield ('\n'.join(lines) + '\n').encode()
@@ -8,14 +8,52 @@ Queues:
 - trade_queue: Holds trade updates from market feeds.
 - quote_queue: Holds quote updates from market feeds.
 - ref_px_queue: Holds reference price updates.
+- bbo_queue: Holds consolidated best bid / offer updates across venues.
 
 Producers push normalized market data into these queues, and consolidators
 consume them to buffer, deduplicate, and store data efficiently.
+
+An asyncio queue has a single consumer, so in-process subscribers (eg. bar aggregation)
+register their own queue per event type with subscribe(). The consolidator publishes
+every message it consumes to these subscriber queues.
 """
 
 import asyncio
+from collections import defaultdict
+from src.logger import get_logger
+
+logger = get_logger(__name__)
 
 trade_queue = asyncio.Queue()
 quote_queue = asyncio.Queue()
 ref_px_queue = asyncio.Queue()
+bbo_queue = asyncio.Queue()
+
+subscribers = defaultdict(list)
+
+def subscribe(event_type: str, maxsize: int=0) -> asyncio.Queue:
+    """
+    Register a new subscriber queue receiving all messages of an event type
+    """
+    queue = asyncio.Queue(maxsize=maxsize)
+    subscribers[event_type].append(queue)
+    logger.info(f'New subscriber for {event_type}, {len(subscribers[event_type])} subscribers')
+    return queue
+
+def unsubscribe(event_type: str, queue: asyncio.Queue):
+    """
+    Remove a subscriber queue, ignoring queues which are not subscribed
+    """
+    if queue in subscribers[event_type]:
+        subscribers[event_type].remove(queue)
 
+def publish(event_type: str, msg: dict):
+    """
+    Push a message to all subscriber queues of an event type without blocking the publisher
+    Messages are dropped for subscribers whose bounded queue is full
+    """
+    for queue in subscribers[event_type]:
+        try:
+            queue.put_nowait(msg)
+        except asyncio.QueueFull:
+            logger.warning(f'Subscriber queue for {event_type} is full, dropping message')
@@ -12,15 +12,19 @@ import pyarrow.parquet as pq
 from datetime import datetime as dtt
 
 from src import constants
-from src.constants import EVENT_TYPE_TRADE, EVENT_TYPE_QUOTE, EVENT_TYPE_REF_PX
-from src.core.queue_manager import trade_queue, quote_queue, ref_px_queue
+from src.constants import EVENT_TYPE_TRADE, EVENT_TYPE_QUOTE, EVENT_TYPE_REF_PX, EVENT_TYPE_BBO, LATE_PARTITION
+from src.core.event_reorderer import EventReorderer
+from src.core.feed_index import add_file_to_index, build_row_group_entries
+from src.core.queue_manager import trade_queue, quote_queue, ref_px_queue, bbo_queue, publish
 from src.logger import get_logger
 
 logger = get_logger(__name__)
 
-def save_to_parquet(buffer: dict, pq_dir: str, event_type: str):
+ROW_GROUP_SIZE = 10_000
+
+def save_to_parquet(buffer: dict, pq_dir: str, event_type: str, row_group_size: int=ROW_GROUP_SIZE):
     """
-    Save buffered events to Parquet file
+    Save buffered events to Parquet file and record its row groups in the sidecar index
     """
     if not buffer:
         logger.info("Buffer is empty, skipping save")
@@ -32,47 +36,100 @@ def save_to_parquet(buffer: dict, pq_dir: str, event_type: str):
     timestamp = ny_time.strftime("%Y%m%d_%H%M%S_%f")
 
     pq_fp = os.path.join(pq_dir, f"consol_feeds_{event_type}_{timestamp}.parquet")
-    pq.write_table(table, pq_fp, compression='snappy')
+    pq.write_table(table, pq_fp, compression='snappy', row_group_size=row_group_size)
+    row_group_sizes = [min(row_group_size, table.num_rows - i) for i in range(0, table.num_rows, row_group_size)]
+    add_file_to_index(pq_dir, event_type, pq_fp, build_row_group_entries(table, row_group_sizes))
     logger.info(f'Successfully saved {len(buffer)} events to consolidated feeds file {pq_fp}')
     buffer.clear()
 
-async def consolidate_queue(queue, event_type, pq_dir:str='src/data/consol_feeds/', buffer_size:int=30):
+async def buffer_events(buffer: dict, events: list, pq_dir: str, event_type: str, buffer_size: int):
+    """
+    Add events to a deduplicating buffer and save it to Parquet once buffer_size is reached
+    """
+    for data in events:
+        key = (data['source'], data['symbol'], data['event_time'])
+        buffer[key] = data
+    logger.debug(f'len(buffer) for {event_type} in {pq_dir}:{len(buffer)}')
+
+    if len(buffer) >= buffer_size:
+        logger.info(f'Buffer size {len(buffer)} >= threshold {buffer_size}.')
+        # The thread saves a detached copy, so a save still running after cancellation never races the shutdown save
+        events_to_save = dict(buffer)
+        buffer.clear()
+        await asyncio.to_thread(save_to_parquet, events_to_save, pq_dir, event_type)
+
+def save_on_shutdown(buffers: dict, pending: list, pq_dir: str, late_pq_dir: str, event_type: str):
+    """
+    Save the events held back by the reorderer together with the main and late buffers
+    """
+    buffer = buffers[event_type]
+    for data in pending:
+        buffer[(data['source'], data['symbol'], data['event_time'])] = data
+    logger.info(f'Saving {len(buffer)} {event_type} events and {len(buffers[LATE_PARTITION])} late events on shutdown')
+    for buffer_pq_dir, buffer in ((pq_dir, buffer), (late_pq_dir, buffers[LATE_PARTITION])):
+        try:
+            save_to_parquet(buffer, buffer_pq_dir, event_type)
+        except Exception as e:
+            logger.error(f'Error saving to parquet file {e}')
+
+async def consolidate_queue(queue, event_type, pq_dir:str='src/data/consol_feeds/', buffer_size:int=30,
+                            allowed_lateness_s:float=2.0, idle_timeout_s:float=5.0):
     """
     Continuously consumes message from a queue and store them into a Parquet file
+    Events are reordered by event_time using per-source watermarks so that each file is sorted by event_time
     Buffers messages until buffer_size is reached, removes duplicates and
     appends data to a file named by event_type and current date
+    Late events behind the watermark are counted and saved separately to the late partition (<pq_dir>/late)
+    Each message is also published to the in-process subscribers of event_type
+    When cancelled, events held back by the reorderer and the buffers are saved before exiting
     """
     logger.info(f'Consolidating queue data for {event_type}')
     buffers = defaultdict(dict)
+    reorderer = EventReorderer(allowed_lateness_s=allowed_lateness_s, idle_timeout_s=idle_timeout_s)
+    late_pq_dir = os.path.join(pq_dir, LATE_PARTITION)
 
-    while True:
-        try:
-            data = (await queue.get())['market_feed']
-            logger.debug(f'data:{data}')
-            if data is None:
-                logger.info('Skipping empty message')
+    try:
+        while True:
+            try:
+                msg = await asyncio.wait_for(queue.get(), timeout=idle_timeout_s)
+            except asyncio.TimeoutError:
+                # No events from any source, release the events held back by the watermark
+                try:
+                    await buffer_events(buffers[event_type], reorderer.pop_ready(), pq_dir, event_type, buffer_size)
+                except Exception as e:
+                    logger.error(f'Error saving to parquet file {e}')
                 continue
 
-            key = (data['source'], data['symbol'], data['event_time'])
-            buffers[event_type][key] = data
-            logger.info(f'len(buffers[event_type]) for {event_type}:{len(buffers[event_type])}')
+            try:
+                data = msg['market_feed']
+                logger.debug(f'data:{data}')
+                if data is None:
+                    logger.info('Skipping empty message')
+                    continue
+                publish(event_type, {'market_feed': data})
 
-            if len(buffers[event_type]) >= buffer_size:
-                logger.info(f'Buffer size {len(buffers[event_type])} >= threshold {buffer_size}.')
-                await asyncio.to_thread(save_to_parquet, buffers[event_type], pq_dir, event_type)
-        except Exception as e:
-            logger.error(f'Error saving to parquet file {e}')
-        finally:
-            queue.task_done()
+                ready, late = reorderer.push(data)
+                await buffer_events(buffers[event_type], ready, pq_dir, event_type, buffer_size)
+                if late:
+                    logger.info(f'{reorderer.late_events} late {event_type} events so far')
+                    await buffer_events(buffers[LATE_PARTITION], late, late_pq_dir, event_type, buffer_size)
+            except Exception as e:
+                logger.error(f'Error saving to parquet file {e}')
+            finally:
+                queue.task_done()
+    except asyncio.CancelledError:
+        save_on_shutdown(buffers, reorderer.flush(), pq_dir, late_pq_dir, event_type)
+        raise
 
 async def run_consolidator():
     """
-    Runs all queue consolidators concurrently for trade, quote and reference price events
+    Runs all queue consolidators concurrently for trade, quote, reference price and consolidated BBO events
     """
     logger.info(f'Running consolidator')
     consumers = [
         consolidate_queue(trade_queue, EVENT_TYPE_TRADE),
         consolidate_queue(quote_queue, EVENT_TYPE_QUOTE),
         consolidate_queue(ref_px_queue, EVENT_TYPE_REF_PX),
+        consolidate_queue(bbo_queue, EVENT_TYPE_BBO),
     ]
     await asyncio.gather(*consumers)
@@ -5,4 +5,8 @@ TIINGO_WS_IEX_URL = TIINGO_WS_BASE_URL + "iex"
 TIINGO_WS_FX_URL = TIINGO_WS_BASE_URL + "fx"
 TIINGO_WS_CRYPTO_URL = TIINGO_WS_BASE_URL + "crypto"
 
-
+TIINGO_REST_KEY = TIINGO_WS_KEY #Tiingo uses the same API key for REST and Websocket APIs
+TIINGO_REST_BASE_URL = "https://api.tiingo.com/"
+TIINGO_REST_IEX_URL = TIINGO_REST_BASE_URL + "iex"
+TIINGO_REST_FX_URL = TIINGO_REST_BASE_URL + "tiingo/fx/top"
+TIINGO_REST_CRYPTO_URL = TIINGO_REST_BASE_URL + "tiingo/crypto/top"
@@ -0,0 +1,140 @@
+"""
+Tiingo WebSocket Frame Decoders Module
+
+Decodes Tiingo WebSocket frames into typed records per endpoint.
+
+Key features:
+- Heartbeat (H) and Connection Initialisation (I) frames leading with their messageType are dropped
+  from a prefix check, without parsing the frame
+- Data frames are parsed by the C JSON scanner directly, without the Python wrapper of json.loads, and their
+  data array becomes a typed positional record per endpoint. Locating the data array by scanning the frame
+  was measured slower than the C scanner on these small frames
+- Frames can be decoded as a batch, eg. a file of recorded frames
+"""
+
+import json
+from json.scanner import make_scanner
+from typing import NamedTuple, Iterable
+from src.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class IexRefPx(NamedTuple):
+    date_iso: str
+    ticker: str
+    ref_px: float
+
+
+class FxQuote(NamedTuple):
+    update_msg_type: str
+    ticker: str
+    date_iso: str
+    bid_size: float
+    bid: float
+    mid: float
+    ask_size: float
+    ask: float
+
+
+class CryptoTrade(NamedTuple):
+    update_msg_type: str
+    ticker: str
+    date_iso: str
+    exch: str
+    last_size: float
+    last_price: float
+
+
+class CryptoQuote(NamedTuple):
+    update_msg_type: str
+    ticker: str
+    date_iso: str
+    exch: str
+    bid_size: float
+    bid: float
+    mid: float
+    ask_size: float
+    ask: float
+
+
+_SKIP_MESSAGE_TYPES = ('H', 'I')
+_SKIP_PREFIXES = tuple(f'{{"messageType":"{msg_type}"' for msg_type in _SKIP_MESSAGE_TYPES)
+_SKIP_PREFIX_LEN = len(_SKIP_PREFIXES[0])
+_MESSAGE_TYPE_KEY = '"messageType"'
+
+_new_tuple = tuple.__new__
+
+
+class TiingoFrameDecoder:
+    """
+    Decodes Tiingo WebSocket frames of one endpoint into data records
+
+    Records are selected by update message type (the first data field) and otherwise by the number of
+    data fields. Without a matching record the data is returned as a list, like json.loads would.
+    Numeric record fields are floats, so decoders with records decode JSON integers as floats
+
+    Args:
+        records_by_type: Update message type to record, eg. {'T': CryptoTrade, 'Q': CryptoQuote}
+        records_by_len: Records selected by their number of fields, eg. (IexRefPx,)
+    """
+    def __init__(self, records_by_type: dict|None=None, records_by_len: tuple=()):
+        self.records_by_type = {msg_type: (record, len(record._fields))
+                                for msg_type, record in (records_by_type or {}).items()}
+        self.records_by_len = {len(record._fields): (record, len(record._fields)) for record in records_by_len}
+        json_decoder = json.JSONDecoder(parse_int=float) if self.records_by_type or self.records_by_len \
+            else json.JSONDecoder()
+        self._scan_once = make_scanner(json_decoder)
+        self._loads = json_decoder.decode
+
+    def decode(self, frame: str|bytes) -> tuple|list|None:
+        """
+        Decode a frame
+
+        Returns:
+            tuple|list: Data record of a data frame, None for heartbeat, initialisation and frames without data
+        """
+        if type(frame) is not str:
+            frame = frame.decode()
+        # A repeated messageType key is left to json.loads, which keeps the last one
+        if frame.startswith(_SKIP_PREFIXES) and frame.find(_MESSAGE_TYPE_KEY, _SKIP_PREFIX_LEN) < 0:
+            return None
+        try:
+            msg_json, end = self._scan_once(frame, 0)
+        except StopIteration:
+            end = -1
+        if end != len(frame):
+            # Surrounding whitespace, trailing data and invalid frames are handled by json.loads
+            msg_json = self._loads(frame)
+        if type(msg_json) is not dict or msg_json.get('messageType') in _SKIP_MESSAGE_TYPES:
+            return None
+        data = msg_json.get('data')
+        if type(data) is not list or not data:
+            return data or None
+        return self.to_record(data)
+
+    def to_record(self, data: list) -> tuple|list:
+        """
+        Convert a data array to its record, or return it unchanged if no record matches
+        """
+        msg_type = data[0]
+        schema = self.records_by_type.get(msg_type) if type(msg_type) is str else None
+        if schema is None:
+            schema = self.records_by_len.get(len(data))
+        if schema is None or len(data) != schema[1]:
+            return data
+        # Length is checked above, so the record is built without the checks of _make
+        return _new_tuple(schema[0], data)
+
+    def decode_batch(self, frames: Iterable[str|bytes]) -> list:
+        """
+        Decode several frames, dropping heartbeat, initialisation and frames without data
+        """
+        decode = self.decode
+        return [record for record in map(decode, frames) if record is not None]
+
+
+IEX_DECODER = TiingoFrameDecoder(records_by_len=(IexRefPx,))
+FX_DECODER = TiingoFrameDecoder(records_by_type={'Q': FxQuote})
+CRYPTO_DECODER = TiingoFrameDecoder(records_by_type={'T': CryptoTrade, 'Q': CryptoQuote})
+GENERIC_DECODER = TiingoFrameDecoder()
@@ -0,0 +1,318 @@
+"""
+Tiingo REST Polling Feed Module
+
+Provides asynchronous functions to poll Tiingo REST top-of-book endpoints for
+stocks, crypto, and FX market data, for symbols and vendors without a websocket feed.
+
+Key features:
+- One pooled HTTP client with keep-alive connections and a concurrency limit shared by all feeds
+- Batches many tickers into each request
+- Per-endpoint rate-limit budgets
+- Conditional requests (ETag / If-Modified-Since), unchanged payloads are skipped
+- Rows whose timestamps have not advanced since the last poll are skipped, so an unchanged ticker in a
+  changed batch is not pushed again
+- Simple normalisation into the same queues as the websocket feeds
+"""
+
+import asyncio
+import hashlib
+import time
+from typing import AsyncGenerator
+import httpx
+from dateutil import parser
+from datetime import datetime as dtt
+from src.logger import get_logger
+from src.constants import NY_TZ, EVENT_TYPE_TRADE, EVENT_TYPE_QUOTE, EVENT_TYPE_REF_PX, ASSET_TYPE_CRYPTO, \
+    ASSET_TYPE_FX, ASSET_TYPE_STK, EXCH_IEX, VENDOR_TIINGO
+from src.utils import convert_dt_to_tz
+import src.data.data_config as data_cfg
+from src.core.queue_manager import trade_queue, quote_queue, ref_px_queue
+
+logger = get_logger(__name__)
+
+
+class RateLimiter:
+    """
+    Token bucket allowing max_requests requests per period_s for one endpoint
+    """
+    def __init__(self, max_requests: int, period_s: float):
+        self.capacity = max_requests
+        self.tokens = float(max_requests)
+        self.refill_per_s = max_requests / period_s
+        self.updated = time.monotonic()
+        self.lock = asyncio.Lock()
+
+    async def acquire(self):
+        """
+        Wait until the budget allows another request
+        """
+        async with self.lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.refill_per_s)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.refill_per_s)
+
+
+class PollingClient:
+    """
+    Pooled HTTP client issuing conditional GET requests and skipping unchanged payloads
+
+    Args:
+        headers: Headers sent with every request. Eg. authorization
+        max_connections: Maximum concurrent requests and pooled keep-alive connections
+        timeout_s: Request timeout in seconds
+    """
+    def __init__(self, headers: dict|None=None, max_connections: int=10, timeout_s: float=10.0):
+        limits = httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections,
+                              keepalive_expiry=60.0)
+        self.client = httpx.AsyncClient(headers=headers, limits=limits, timeout=timeout_s)
+        self.semaphore = asyncio.Semaphore(max_connections)
+        self.validators = {}
+
+    async def get_if_changed(self, url: str, params: dict, rate_limiter: RateLimiter|None=None) -> list|dict|None:
+        """
+        GET a JSON payload, sending the ETag / Last-Modified validators of the previous response
+
+        Returns:
+            list|dict: Decoded payload, None if the server replied 304 Not Modified, rate limited the
+            request, or returned the same payload as the previous request
+        """
+        cache_key = (url, tuple(sorted(params.items())))
+        etag, last_modified, digest = self.validators.get(cache_key, (None, None, None))
+        headers = {}
+        if etag:
+            headers['If-None-Match'] = etag
+        if last_modified:
+            headers['If-Modified-Since'] = last_modified
+
+        # The endpoint budget is taken before a connection slot, so a throttled endpoint does not block the others
+        if rate_limiter is not None:
+            await rate_limiter.acquire()
+        async with self.semaphore:
+            resp = await self.client.get(url, params=params, headers=headers)
+
+        if resp.status_code == 304:
+            logger.debug(f'Not modified {url} {params}')
+            return None
+        if resp.status_code == 429:
+            retry_after = float(resp.headers.get('Retry-After', 1))
+            logger.warning(f'Rate limited by {url}, retrying after {retry_after}s')
+            await asyncio.sleep(retry_after)
+            return None
+        resp.raise_for_status()
+
+        new_digest = hashlib.blake2b(resp.content, digest_size=16).digest()
+        self.validators[cache_key] = (resp.headers.get('ETag'), resp.headers.get('Last-Modified'), new_digest)
+        if new_digest == digest:
+            logger.debug(f'Unchanged payload {url} {params}')
+            return None
+        return resp.json()
+
+    async def aclose(self):
+        await self.client.aclose()
+
+
+def get_tiingo_polling_client(max_connections: int=10) -> PollingClient:
+    """
+    Pooled polling client authorised for the Tiingo REST API
+    """
+    headers = {'Authorization': f'Token {data_cfg.TIINGO_REST_KEY}', 'Content-Type': 'application/json'}
+    return PollingClient(headers=headers, max_connections=max_connections)
+
+
+async def tiingo_rest_poll(client: PollingClient, url: str, tickers: list, rate_limiter: RateLimiter|None=None,
+                           batch_size: int=50, interval_s: float=5.0) -> AsyncGenerator[dict, None]:
+    """
+    Poll a Tiingo REST endpoint and yield market data rows of changed payloads
+    Tickers are split into batches of batch_size, with one request per batch every interval_s
+
+    Args:
+        client: Pooled polling client
+        url: URL of the Tiingo REST endpoint
+        tickers: List of ticker symbols
+        rate_limiter: Request budget of the endpoint
+        batch_size: Maximum number of tickers per request
+        interval_s: Seconds between the start of polling cycles
+    Yields:
+        dict: Market data row of a ticker
+    """
+    tickers = [ticker.lower() for ticker in tickers]
+    batches = [tickers[i:i + batch_size] for i in range(0, len(tickers), batch_size)]
+    while True:
+        started = time.monotonic()
+        results = await asyncio.gather(
+            *(client.get_if_changed(url, {'tickers': ','.join(batch)}, rate_limiter) for batch in batches),
+            return_exceptions=True
+        )
+        for batch, result in zip(batches, results):
+            if isinstance(result, Exception):
+                logger.error(f'Error polling {url} for {batch}: {result!r}')
+                continue
+            for row in result or []:
+                logger.debug(f'row:{row}')
+                yield row
+        await asyncio.sleep(max(0.0, interval_s - (time.monotonic() - started)))
+
+
+def is_advanced(last_seen: dict, key: tuple, timestamp: dtt) -> bool:
+    """
+    Check that a timestamp advanced past the last one seen for key, eg. (url, ticker, 'quoteTimestamp'),
+    and record it as the last seen
+    """
+    previous = last_seen.get(key)
+    if previous is not None and timestamp <= previous:
+        return False
+    last_seen[key] = timestamp
+    return True
+
+
+async def iex_stocks_poll_feed(tickers: dict, client: PollingClient, rate_limiter: RateLimiter|None=None,
+                               url: str=data_cfg.TIINGO_REST_IEX_URL, **poll_kwargs):
+    """
+    Push normalised reference price data polled from the IEX endpoint into market_feed queue
+    The message is wrapped in a dictionary with the key market_feed
+    so that the consolidator processes it consistently with other market feeds
+
+    Args:
+        tickers: Dict of ticker asset type and ticker symbols
+        client: Pooled polling client
+        rate_limiter: Request budget of the IEX endpoint
+        url: URL of the IEX endpoint
+    """
+    last_seen = {}
+    async for raw_data in tiingo_rest_poll(client, url, tickers['STK'] + tickers['ETF'], rate_limiter, **poll_kwargs):
+        if raw_data.get('tngoLast') is None or raw_data.get('timestamp') is None:
+            continue
+        timestamp = convert_dt_to_tz(parser.isoparse(raw_data['timestamp']))
+        if not is_advanced(last_seen, (url, raw_data['ticker'].lower(), 'timestamp'), timestamp):
+            continue
+        normalised_data = {
+            'asset_type': ASSET_TYPE_STK,
+            'event_type': EVENT_TYPE_REF_PX,
+            'symbol': raw_data['ticker'].lower(),
+            'price': raw_data['tngoLast'],
+            'vendor': VENDOR_TIINGO,
+            'source': 'tiingo_iex_poll',
+            'exchange': EXCH_IEX,
+            'event_time': timestamp,
+            'created_at': dtt.now(NY_TZ)
+        }
+        logger.debug(f'normalised_data:{normalised_data}')
+        await ref_px_queue.put({'market_feed':normalised_data})
+
+
+async def fx_poll_feed(tickers: dict, client: PollingClient, rate_limiter: RateLimiter|None=None,
+                       url: str=data_cfg.TIINGO_REST_FX_URL, **poll_kwargs):
+    """
+    Push normalised FX quotes data polled from the FX top-of-book endpoint into market_feed queue
+
+    Args:
+        tickers: Dict of ticker asset type and ticker symbols
+        client: Pooled polling client
+        rate_limiter: Request budget of the FX endpoint
+        url: URL of the FX top-of-book endpoint
+    """
+    last_seen = {}
+    async for raw_data in tiingo_rest_poll(client, url, tickers['FX'], rate_limiter, **poll_kwargs):
+        if raw_data.get('quoteTimestamp') is None:
+            continue
+        timestamp = convert_dt_to_tz(parser.isoparse(raw_data['quoteTimestamp']))
+        if not is_advanced(last_seen, (url, raw_data['ticker'].lower(), 'quoteTimestamp'), timestamp):
+            continue
+        normalised_data = {
+            'asset_type': ASSET_TYPE_FX,
+            'event_type': EVENT_TYPE_QUOTE,
+            'symbol': raw_data['ticker'].lower(),
+            'bid_size': raw_data.get('bidSize'),
+            'ask_size': raw_data.get('askSize'),
+            'bid': raw_data.get('bidPrice'),
+            'ask': raw_data.get('askPrice'),
+            'mid': raw_data.get('midPrice'),
+            'event_time': timestamp,
+            'vendor': VENDOR_TIINGO,
+            'source': 'tiingo_fx_poll',
+            'exchange': None,
+            'created_at': dtt.now(NY_TZ)
+        }
+        logger.debug(f'normalised_data:{normalised_data}')
+        await quote_queue.put({'market_feed':normalised_data})
+
+
+async def crypto_poll_feed(tickers: dict, client: PollingClient, rate_limiter: RateLimiter|None=None,
+                           url: str=data_cfg.TIINGO_REST_CRYPTO_URL, **poll_kwargs):
+    """
+    Push normalised Crypto trades and quotes data polled from the crypto top-of-book endpoint into market_feed queue
+    Each row holds the top-of-book across exchanges, so quotes use the source as venue (exchange None)
+
+    Args:
+        tickers: Dict of ticker asset type and ticker symbols
+        client: Pooled polling client
+        rate_limiter: Request budget of the crypto endpoint
+        url: URL of the crypto top-of-book endpoint
+    """
+    last_seen = {}
+    async for raw_data in tiingo_rest_poll(client, url, tickers['CRYPTO'], rate_limiter, **poll_kwargs):
+        ticker = raw_data['ticker'].lower()
+        for top_of_book in raw_data.get('topOfBookData') or []:
+            if top_of_book.get('lastSaleTimestamp') and top_of_book.get('lastPrice') is not None:
+                timestamp = convert_dt_to_tz(parser.isoparse(top_of_book['lastSaleTimestamp']))
+                if is_advanced(last_seen, (url, ticker, 'lastSaleTimestamp'), timestamp):
+                    normalised_data = {
+                        'asset_type': ASSET_TYPE_CRYPTO,
+                        'event_type': EVENT_TYPE_TRADE,
+                        'symbol': ticker,
+                        'last_size': top_of_book.get('lastSize'),
+                        'last_price': top_of_book['lastPrice'],
+                        'event_time': timestamp,
+                        'vendor': VENDOR_TIINGO,
+                        'source': 'tiingo_crypto_poll',
+                        'exchange': top_of_book.get('lastExchange'),
+                        'created_at': dtt.now(NY_TZ)
+                    }
+                    logger.debug(f'normalised_data:{normalised_data}')
+                    await trade_queue.put({'market_feed':normalised_data})
+            if top_of_book.get('quoteTimestamp'):
+                timestamp = convert_dt_to_tz(parser.isoparse(top_of_book['quoteTimestamp']))
+                if not is_advanced(last_seen, (url, ticker, 'quoteTimestamp'), timestamp):
+                    continue
+                bid, ask = top_of_book.get('bidPrice'), top_of_book.get('askPrice')
+                normalised_data = {
+                    'asset_type': ASSET_TYPE_CRYPTO,
+                    'event_type': EVENT_TYPE_QUOTE,
+                    'symbol': ticker,
+                    'bid_size': top_of_book.get('bidSize'),
+                    'ask_size': top_of_book.get('askSize'),
+                    'bid': bid,
+                    'ask': ask,
+                    'mid': (bid + ask) / 2 if bid is not None and ask is not None else None,
+                    'event_time': timestamp,
+                    'vendor': VENDOR_TIINGO,
+                    'source': 'tiingo_crypto_poll',
+                    'exchange': None,
+                    'created_at': dtt.now(NY_TZ)
+                }
+                logger.debug(f'normalised_data:{normalised_data}')
+                await quote_queue.put({'market_feed':normalised_data})
+
+
+async def run_tiingo_poll_feeds(tickers: dict, max_connections: int=10, interval_s: float=5.0,
+                                requests_per_min: int=60, batch_size: int=50):
+    """
+    Runs the IEX, FX and crypto polling feeds concurrently over one pooled HTTP client
+    Each endpoint has its own budget of requests_per_min requests per minute
+    """
+    logger.info(f'Running Tiingo polling feeds every {interval_s}s')
+    client = get_tiingo_polling_client(max_connections=max_connections)
+    poll_kwargs = {'batch_size': batch_size, 'interval_s': interval_s}
+    try:
+        await asyncio.gather(
+            iex_stocks_poll_feed(tickers, client, RateLimiter(requests_per_min, 60), **poll_kwargs),
+            fx_poll_feed(tickers, client, RateLimiter(requests_per_min, 60), **poll_kwargs),
+            crypto_poll_feed(tickers, client, RateLimiter(requests_per_min, 60), **poll_kwargs),
+        )
+    finally:
+        await client.aclose()
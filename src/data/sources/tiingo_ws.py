@@ -7,6 +7,7 @@ stocks, crypto, and FX market data.
 Key features:
 - Subscribes to market data with customisable payloads and threshold levels
 - Yields live market data as async generator objects
+- Decodes frames into typed records with a decoder per endpoint, dropping heartbeats from a prefix check
 - Simple normalisation of data from different market feeds
 - Automatically reconnects if the WebSocket connection closes
 """
@@ -25,6 +26,8 @@ from src.constants import NY_TZ, EVENT_TYPE_TRADE, EVENT_TYPE_QUOTE, EVENT_TYPE_
 from src.utils import convert_dt_to_tz
 import src.data.data_config as data_cfg
 from src.core.queue_manager import trade_queue, quote_queue, ref_px_queue
+from src.data.sources.tiingo_decoders import TiingoFrameDecoder, GENERIC_DECODER, IEX_DECODER, FX_DECODER, \
+    CRYPTO_DECODER
 
 logger = get_logger(__name__)
 
@@ -52,7 +55,8 @@ def get_top_book_trade_event_payload(tickers:list, threshold_level:int=6) -> dic
     logger.debug(f'subscribe_payload:{subscribe_payload}')
     return subscribe_payload
 
-async def tiingo_ws_request(subscribe_payload:dict, ws_url:str) -> AsyncGenerator[list, None]:
+async def tiingo_ws_request(subscribe_payload:dict, ws_url:str,
+                            decoder:TiingoFrameDecoder=GENERIC_DECODER) -> AsyncGenerator[tuple|list, None]:
     """
     Connect to Tiingo Websocket feed and yield market data
     Filters out Heartbeat (H) and Connection Initialisation (I) messages
@@ -60,8 +64,9 @@ async def tiingo_ws_request(subscribe_payload:dict, ws_url:str) -> AsyncGenerato
     Args:
         subscribe_payload: Subscribe payload for Tiingo Websocket API request
         ws_url: Websocket URL of the Tiingo feed
+        decoder: Frame decoder of the endpoint
     Yields:
-        list: Market data
+        tuple|list: Market data record
     """
     while True:
         try:
@@ -70,10 +75,8 @@ async def tiingo_ws_request(subscribe_payload:dict, ws_url:str) -> AsyncGenerato
                 await ws.send(json.dumps(subscribe_payload))
                 while True:
                     msg = await ws.recv()
-                    msg_json = json.loads(msg)
-                    logger.debug(f'msg_json:{msg_json}')
-                    if msg_json and msg_json.get('messageType') not in ('I', 'H'):
-                        data = msg_json.get('data')
+                    data = decoder.decode(msg)
+                    if data is not None:
                         logger.debug(f'data:{data}')
                         yield data
 
@@ -93,7 +96,7 @@ async def iex_stocks_feed(tickers:dict, threshold_level:int=6):
         threshold_level: threshold_level of 6 gets price updates when a reference price change is detected
     """
     subscribe_payload = get_top_book_trade_event_payload(tickers['STK']+tickers['ETF'], threshold_level=threshold_level)
-    async for raw_data in tiingo_ws_request(subscribe_payload, data_cfg.TIINGO_WS_IEX_URL):
+    async for raw_data in tiingo_ws_request(subscribe_payload, data_cfg.TIINGO_WS_IEX_URL, decoder=IEX_DECODER):
         logger.info(f'iex raw_data:{raw_data}')
         date_iso, ticker, ref_px = raw_data
         timestamp = parser.isoparse(date_iso)
@@ -123,7 +126,7 @@ async def fx_feed(tickers:dict, threshold_level:int=5):
         threshold_level: threshold_level of 5 gets ALL Top-of-Book updates.
     """
     subscribe_payload = get_top_book_trade_event_payload(tickers['FX'], threshold_level=threshold_level)
-    async for raw_data in tiingo_ws_request(subscribe_payload, data_cfg.TIINGO_WS_FX_URL):
+    async for raw_data in tiingo_ws_request(subscribe_payload, data_cfg.TIINGO_WS_FX_URL, decoder=FX_DECODER):
         logger.info(f'fx raw_data:{raw_data}')
         update_msg_type, ticker, date_iso, bid_size, bid, mid, ask_size, ask = raw_data
         timestamp = parser.isoparse(date_iso)
@@ -159,7 +162,7 @@ async def crypto_feed(tickers:dict, threshold_level:int=2):
             A "thresholdLevel" of 5 gets only Last Trade updates
     """
     subscribe_payload = get_top_book_trade_event_payload(tickers['CRYPTO'], threshold_level=threshold_level)
-    async for raw_data in tiingo_ws_request(subscribe_payload, data_cfg.TIINGO_WS_CRYPTO_URL):
+    async for raw_data in tiingo_ws_request(subscribe_payload, data_cfg.TIINGO_WS_CRYPTO_URL, decoder=CRYPTO_DECODER):
         logger.info(f'crypto raw_data:{raw_data}')
         if raw_data[0] == 'T':
             update_msg_type, ticker, date_iso, exch, last_size, last_price = raw_data
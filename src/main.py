@@ -1,16 +1,24 @@
 import asyncio
 import uvicorn
 from fastapi import FastAPI
+from src.api.feed_query_api import router as feed_query_router
+from src.api.webhook_api import router as webhook_router
+from src.core.bar_aggregator import run_bar_aggregator
+from src.core.bbo_engine import run_bbo_engine
 from src.core.raw_feed_consolidator import run_consolidator
 from src.data.sources import tiingo_ws as tiingo
 from src.utils import load_tickers
 
 app = FastAPI()
+app.include_router(feed_query_router)
+app.include_router(webhook_router)
 
 @app.on_event('startup')
 async def startup():
     tickers = load_tickers()
     asyncio.create_task(run_consolidator())
+    asyncio.create_task(run_bar_aggregator())
+    asyncio.create_task(run_bbo_engine())
 
     asyncio.create_task(tiingo.iex_stocks_feed(tickers))
     asyncio.create_task(tiingo.crypto_feed(tickers))
@@ -1,11 +1,14 @@
 import pandas as pd
 import pytz
-from datetime import datetime as dtt
+from datetime import datetime as dtt, timedelta
 from src.constants import NY_TZ
 from src.logger import get_logger
 
 logger = get_logger(__name__)
 
+EPOCH = dtt(1970, 1, 1, tzinfo=pytz.UTC)
+US = timedelta(microseconds=1)
+
 def load_tickers(fp='src/data/tickers.csv') -> dict:
     """
     Loads tickers from csv file and groups them by asset type
@@ -26,3 +29,11 @@ def convert_dt_to_tz(timestamp: dtt, tz:pytz.BaseTzInfo|None=None) -> dtt:
     if timestamp.tzinfo is None:
         timestamp = pytz.UTC.localize(timestamp)
     return timestamp.astimezone(tz)
+
+def to_epoch_us(timestamp: dtt) -> int:
+    """
+    Convert a datetime object to microseconds since epoch. Naive datetimes are treated as UTC
+    """
+    if timestamp.tzinfo is None:
+        timestamp = pytz.UTC.localize(timestamp)
+    return (timestamp - EPOCH) // US
@@ -0,0 +1,73 @@
+import io
+import json
+import os
+import tempfile
+import unittest
+from datetime import datetime as dtt
+from unittest.mock import patch
+import pyarrow as pa
+from fastapi.testclient import TestClient
+
+from src.constants import NY_TZ
+from src.core.raw_feed_consolidator import save_to_parquet
+from src.main import app
+
+
+class TestFeedQueryApi(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        events = [
+            {'symbol': symbol, 'source': 'tiingo_iex', 'price': 10.0 + i,
+             'event_time': NY_TZ.localize(dtt(2026, 2, 14, 9, 30, i))}
+            for i, symbol in enumerate(['spy', 'aapl', 'spy'])
+        ]
+        save_to_parquet({(e['source'], e['symbol'], e['event_time']): e for e in events}, self.tmp_dir.name, 'ref_px')
+        self.patcher = patch('src.api.feed_query_api.CONSOL_FEEDS_DIR', self.tmp_dir.name)
+        self.patcher.start()
+        self.client = TestClient(app)
+
+    def tearDown(self):
+        self.patcher.stop()
+        self.tmp_dir.cleanup()
+
+    def test_get_feeds_ndjson(self):
+        resp = self.client.get('/feeds/ref_px', params={'symbols': 'spy', 'start': '2026-02-14T14:30:01Z'})
+        self.assertEqual(resp.status_code, 200)
+        rows = [json.loads(line) for line in resp.text.splitlines()]
+        self.assertEqual([row['price'] for row in rows], [12.0])
+
+    def test_get_feeds_arrow(self):
+        resp = self.client.get('/feeds/ref_px', params=[('symbols', 'spy,aapl'), ('format', 'arrow')])
+        self.assertEqual(resp.status_code, 200)
+        table = pa.ipc.open_stream(io.BytesIO(resp.content)).read_all()
+        self.assertEqual(table.num_rows, 3)
+
+    def test_get_feeds_late_partition(self):
+        late_event = {'symbol': 'spy', 'source': 'tiingo_iex', 'price': 9.0,
+                      'event_time': NY_TZ.localize(dtt(2026, 2, 14, 9, 29))}
+        save_to_parquet({('tiingo_iex', 'spy', late_event['event_time']): late_event},
+                        os.path.join(self.tmp_dir.name, 'late'), 'ref_px')
+
+        resp = self.client.get('/feeds/ref_px', params={'symbols': 'spy', 'late': 'true'})
+        self.assertEqual([json.loads(line)['price'] for line in resp.text.splitlines()], [9.0])
+        resp = self.client.get('/feeds/ref_px', params={'symbols': 'spy'})
+        self.assertEqual(len(resp.text.splitlines()), 2)
+
+    def test_get_feeds_unknown_event_type(self):
+        resp = self.client.get('/feeds/bars')
+        self.assertEqual(resp.status_code, 404)
+
+    def test_get_feeds_invalid_range(self):
+        resp = self.client.get('/feeds/ref_px', params={'start': '2026-02-15T00:00:00', 'end': '2026-02-14T00:00:00'})
+        self.assertEqual(resp.status_code, 422)
+
+    def test_get_feeds_unknown_columns(self):
+        resp = self.client.get('/feeds/ref_px', params={'columns': 'symbol,unknown'})
+        self.assertEqual(resp.status_code, 422)
+        self.assertIn('unknown', resp.json()['detail'])
+        resp = self.client.get('/feeds/ref_px', params={'columns': 'symbol'})
+        self.assertEqual([json.loads(line) for line in resp.text.splitlines()][0], {'symbol': 'spy'})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,166 @@
+import asyncio
+import json
+import unittest
+from unittest.mock import patch
+from fastapi.testclient import TestClient
+
+from src import constants
+from src.api.webhook_api import iter_ndjson, iter_json_array, normalise_webhook_event, WebhookPayloadError, \
+    WebhookPayloadTooLarge
+from src.main import app
+
+
+def trade(symbol='BTCUSD', price=100.0):
+    return {'event_type': 'trade', 'symbol': symbol, 'price': price, 'size': 0.5, 'exchange': 'gdax',
+            'asset_type': constants.ASSET_TYPE_CRYPTO, 'event_time': '2026-02-13T15:00:00.123456+00:00'}
+
+
+def quote(symbol='eurusd'):
+    return {'event_type': 'quote', 'symbol': symbol, 'bid': 1.1, 'ask': 1.2, 'bid_size': 10, 'ask_size': 20,
+            'event_time': '2026-02-13T15:00:00+00:00'}
+
+
+def ref_px(symbol='spy'):
+    return {'event_type': 'ref_px', 'symbol': symbol, 'price': 10.5, 'event_time': '2026-02-13T10:00:00-05:00'}
+
+
+async def chunked(data: bytes, size: int):
+    for i in range(0, len(data), size):
+        yield data[i:i + size]
+
+
+async def collect(parser, data: bytes, size: int):
+    return [item async for item in parser(chunked(data, size))]
+
+
+async def collect_limited(parser, data: bytes, size: int, max_event_size: int):
+    return [item async for item in parser(chunked(data, size), max_event_size=max_event_size)]
+
+
+class TestWebhookParsing(unittest.TestCase):
+    def test_iter_json_array_any_chunking(self):
+        items = [trade(), quote(), {'nested': {'list': [1, 2, {'a': ']'}]}, 'text': 'br}ace ü'}]
+        data = json.dumps(items, indent=1).encode()
+        for size in (1, 3, 7, 64, len(data)):
+            self.assertEqual(asyncio.run(collect(iter_json_array, data, size)), items)
+
+    def test_iter_json_array_single_object_and_empty_array(self):
+        self.assertEqual(asyncio.run(collect(iter_json_array, json.dumps(trade()).encode(), 5)), [trade()])
+        self.assertEqual(asyncio.run(collect(iter_json_array, b' [ ] ', 2)), [])
+
+    def test_iter_json_array_invalid(self):
+        for data in (b'', b'[{"a": 1}', b'[{"a": 1} {"b": 2}]', b'[1, 2]', b'[{"a": 1}] x', b'"text"', b'[{"a": }]',
+                     b'[{"a": 1},]', b'[,]', b'[{"a": 1},,{"b": 2}]'):
+            with self.assertRaises(WebhookPayloadError, msg=data):
+                asyncio.run(collect(iter_json_array, data, 3))
+
+    def test_iter_ndjson(self):
+        items = [trade(), quote(), ref_px()]
+        data = ('\n'.join(json.dumps(item) for item in items) + '\n\n').encode()
+        for size in (1, 10, len(data)):
+            self.assertEqual(asyncio.run(collect(iter_ndjson, data, size)), items)
+        with self.assertRaises(WebhookPayloadError):
+            asyncio.run(collect(iter_ndjson, b'{"a": 1}\n{"b"', 4))
+
+    def test_event_size_limit(self):
+        big = json.dumps([trade(), {**trade(), 'note': 'x' * 500}]).encode()
+        for parser, data in ((iter_json_array, big), (iter_json_array, b'[{"note": "' + b'x' * 500),
+                             (iter_ndjson, b'{"a": 1}\n{"note": "' + b'x' * 500 + b'"}\n')):
+            for size in (7, 64, len(data)):
+                with self.assertRaises(WebhookPayloadTooLarge, msg=(parser, size)):
+                    asyncio.run(collect_limited(parser, data, size, 200))
+        self.assertEqual(len(asyncio.run(collect_limited(iter_json_array, json.dumps([trade()] * 20).encode(), 5,
+                                                         300))), 20)
+
+    def test_normalise_webhook_event(self):
+        event_type, data = normalise_webhook_event(trade(), 'vendorx', 'vendorx_webhook', None)
+        self.assertEqual(event_type, constants.EVENT_TYPE_TRADE)
+        self.assertEqual((data['symbol'], data['last_price'], data['last_size'], data['exchange']),
+                         ('btcusd', 100.0, 0.5, 'gdax'))
+        self.assertEqual(data['event_time'].tzinfo.zone, constants.NY_TZ.zone)
+        self.assertEqual(data['source'], 'vendorx_webhook')
+
+        event_type, data = normalise_webhook_event(quote(), 'vendorx', 'vendorx_webhook', None)
+        self.assertEqual(data['mid'], (1.1 + 1.2) / 2)
+        self.assertEqual(data['bid_size'], 10.0)
+
+        _, data = normalise_webhook_event({**ref_px(), 'event_time': '2026-02-13T10:00:00.123456789-05:00'},
+                                          'vendorx', 'vendorx_webhook', None)
+        self.assertEqual(data['event_time'].microsecond, 123456)
+
+        for invalid in ({**trade(), 'price': 'abc'}, {**quote(), 'event_type': 'bars'}, {'symbol': 'spy'},
+                        {**ref_px(), 'event_time': 12}):
+            with self.assertRaises((KeyError, TypeError, ValueError)):
+                normalise_webhook_event(invalid, 'vendorx', 'vendorx_webhook', None)
+
+
+class TestWebhookApi(unittest.TestCase):
+    def setUp(self):
+        self.queues = {name: asyncio.Queue() for name in ('trade_queue', 'quote_queue', 'ref_px_queue')}
+        self.patchers = [patch(f'src.api.webhook_api.{name}', queue) for name, queue in self.queues.items()]
+        for patcher in self.patchers:
+            patcher.start()
+        self.client = TestClient(app)
+
+    def tearDown(self):
+        for patcher in self.patchers:
+            patcher.stop()
+
+    def test_receive_json_array(self):
+        resp = self.client.post('/webhooks/VendorX', json=[trade(), quote(), ref_px(), {'event_type': 'trade'}])
+        self.assertEqual(resp.status_code, 202)
+        self.assertEqual(resp.json(), {'accepted': 3, 'rejected': 1})
+        self.assertEqual([queue.qsize() for queue in self.queues.values()], [1, 1, 1])
+        feed = self.queues['trade_queue'].get_nowait()['market_feed']
+        self.assertEqual(feed['vendor'], 'vendorx')
+        self.assertEqual(feed['source'], 'vendorx_webhook')
+        self.assertIsNotNone(feed['created_at'])
+
+    def test_receive_ndjson(self):
+        body = '\n'.join(json.dumps(item) for item in [trade(), trade('ethusd'), quote()])
+        resp = self.client.post('/webhooks/vendorx', content=body,
+                                headers={'Content-Type': 'application/x-ndjson'})
+        self.assertEqual(resp.status_code, 202)
+        self.assertEqual(resp.json()['accepted'], 3)
+        self.assertEqual(self.queues['trade_queue'].qsize(), 2)
+
+    def test_invalid_body(self):
+        resp = self.client.post('/webhooks/vendorx', content=b'[{"event_type": ',
+                                headers={'Content-Type': 'application/json'})
+        self.assertEqual(resp.status_code, 400)
+        self.assertEqual(sum(queue.qsize() for queue in self.queues.values()), 0)
+
+    def test_queues_full(self):
+        with patch('src.api.webhook_api.MAX_QUEUE_SIZE', 2):
+            resp = self.client.post('/webhooks/vendorx', json=[trade(), trade()])
+            self.assertEqual(resp.status_code, 202)
+            resp = self.client.post('/webhooks/vendorx', json=[trade()])
+        self.assertEqual(resp.status_code, 503)
+        self.assertEqual(resp.headers['Retry-After'], '1')
+        self.assertEqual(self.queues['trade_queue'].qsize(), 2)
+
+    def test_batch_above_queue_capacity_not_queued(self):
+        with patch('src.api.webhook_api.MAX_QUEUE_SIZE', 3):
+            resp = self.client.post('/webhooks/vendorx', json=[trade(), trade()])
+            self.assertEqual(resp.status_code, 202)
+            resp = self.client.post('/webhooks/vendorx', json=[quote(), trade(), trade()])
+        self.assertEqual(resp.status_code, 503)
+        self.assertEqual([queue.qsize() for queue in self.queues.values()], [2, 0, 0])
+
+    def test_request_limits(self):
+        with patch('src.api.webhook_api.MAX_EVENTS_PER_REQUEST', 2):
+            resp = self.client.post('/webhooks/vendorx', json=[trade(), quote(), ref_px()])
+        self.assertEqual(resp.status_code, 413)
+        with patch('src.api.webhook_api.MAX_BODY_BYTES', 100):
+            resp = self.client.post('/webhooks/vendorx', json=[trade(), quote()])
+            self.assertEqual(resp.status_code, 413)
+
+            def body():
+                yield json.dumps([trade(), quote()]).encode()
+            resp = self.client.post('/webhooks/vendorx', content=body())
+            self.assertEqual(resp.status_code, 413)
+        self.assertEqual(sum(queue.qsize() for queue in self.queues.values()), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
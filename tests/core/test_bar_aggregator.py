@@ -0,0 +1,227 @@
+import asyncio
+import tempfile
+import unittest
+from datetime import datetime as dtt
+from unittest.mock import patch, AsyncMock, MagicMock
+import pyarrow.dataset as ds
+
+from src import constants
+from src.constants import NY_TZ, EVENT_TYPE_TRADE, EVENT_TYPE_QUOTE, EVENT_TYPE_REF_PX
+from src.core.bar_aggregator import BarAggregator, bars_to_table, save_bars_to_parquet, aggregate_queue, \
+    run_bar_aggregator, get_price_size
+
+
+def event_time(second, microsecond=0):
+    return NY_TZ.localize(dtt(2026, 2, 14, 9, 30, second, microsecond))
+
+
+def trade(symbol, second, price, size, microsecond=0):
+    return {'asset_type': constants.ASSET_TYPE_CRYPTO, 'event_type': EVENT_TYPE_TRADE, 'symbol': symbol,
+            'source': 'tiingo_crypto', 'last_price': price, 'last_size': size,
+            'event_time': event_time(second, microsecond)}
+
+
+def quote(symbol, second, bid, ask, microsecond=0):
+    return {'asset_type': constants.ASSET_TYPE_FX, 'event_type': EVENT_TYPE_QUOTE, 'symbol': symbol,
+            'source': 'tiingo_fx', 'bid': bid, 'ask': ask, 'mid': (bid + ask) / 2,
+            'event_time': event_time(second, microsecond)}
+
+
+class TestBarAggregator(unittest.IsolatedAsyncioTestCase):
+    def test_get_price_size(self):
+        self.assertEqual(get_price_size(trade('btcusd', 0, 10.0, 2.0), EVENT_TYPE_TRADE), (10.0, 2.0))
+        self.assertEqual(get_price_size({'bid': 1.0, 'ask': 3.0}, EVENT_TYPE_QUOTE), (2.0, 0.0))
+        self.assertEqual(get_price_size({'price': 5.0}, EVENT_TYPE_REF_PX), (5.0, 0.0))
+
+    def test_trade_bars_ohlcv_vwap(self):
+        aggregator = BarAggregator(EVENT_TYPE_TRADE, intervals_s=(1,), allowed_lateness_s=0)
+        for data in [trade('btcusd', 0, 10.0, 1.0), trade('btcusd', 0, 12.0, 3.0, 500_000),
+                     trade('btcusd', 0, 9.0, 1.0, 900_000), trade('btcusd', 0, 11.0, 5.0, 300_000),
+                     trade('btcusd', 1, 20.0, 1.0)]:
+            aggregator.update(data)
+
+        bars = aggregator.drain()
+        self.assertEqual(len(bars), 1)
+        table = bars_to_table(bars, EVENT_TYPE_TRADE).to_pylist()[0]
+        self.assertEqual((table['open'], table['high'], table['low'], table['close']), (10.0, 12.0, 9.0, 9.0))
+        self.assertEqual(table['volume'], 10.0)
+        self.assertAlmostEqual(table['vwap'], (10.0 + 36.0 + 9.0 + 55.0) / 10.0)
+        self.assertEqual(table['count'], 4)
+        self.assertEqual(table['bar_start'], event_time(0))
+        self.assertEqual(table['bar_end'], event_time(1))
+        self.assertEqual(table['date'], '2026-02-14')
+        self.assertEqual(len(aggregator.open_bars), 1)
+
+    def test_quote_bars_twap(self):
+        aggregator = BarAggregator(EVENT_TYPE_QUOTE, intervals_s=(1,), allowed_lateness_s=0)
+        aggregator.update(quote('eurusd', 0, 1.0, 1.0))
+        aggregator.update(quote('eurusd', 0, 2.0, 2.0, 250_000))
+        aggregator.update(quote('eurusd', 2, 3.0, 3.0))
+
+        row = bars_to_table(aggregator.drain(), EVENT_TYPE_QUOTE).to_pylist()[0]
+        self.assertEqual((row['open'], row['high'], row['low'], row['close']), (1.0, 2.0, 1.0, 2.0))
+        self.assertAlmostEqual(row['twap'], 0.25 * 1.0 + 0.75 * 2.0)
+        self.assertNotIn('vwap', row)
+
+    def test_multiple_intervals_and_symbols(self):
+        aggregator = BarAggregator(EVENT_TYPE_TRADE, intervals_s=(1, 60), allowed_lateness_s=0)
+        aggregator.update(trade('btcusd', 0, 10.0, 1.0))
+        aggregator.update(trade('ethusd', 0, 5.0, 1.0))
+        aggregator.update(trade('btcusd', 1, 11.0, 1.0))
+
+        closed = {(bar.symbol, bar.interval_s) for bar in aggregator.drain()}
+        self.assertEqual(closed, {('btcusd', 1), ('ethusd', 1)})
+        self.assertEqual(len(aggregator.open_bars), 3)  # btcusd 1s, btcusd 60s, ethusd 60s
+
+    def test_allowed_lateness_and_late_events(self):
+        aggregator = BarAggregator(EVENT_TYPE_TRADE, intervals_s=(1,), allowed_lateness_s=1)
+        aggregator.update(trade('btcusd', 0, 10.0, 1.0))
+        aggregator.update(trade('btcusd', 1, 11.0, 1.0, 500_000))
+        aggregator.update(trade('btcusd', 0, 12.0, 1.0, 600_000))  # within lateness, bar still open
+        self.assertEqual(aggregator.closed_bars, [])
+
+        aggregator.update(trade('btcusd', 2, 13.0, 1.0))
+        aggregator.update(trade('btcusd', 0, 14.0, 1.0, 700_000))  # bar closed, late
+        self.assertEqual(aggregator.late_events, 1)
+        bars = aggregator.drain()
+        self.assertEqual([(bar.count, bar.close) for bar in bars], [(2, 12.0)])
+
+    def test_late_events_counted_per_event(self):
+        aggregator = BarAggregator(EVENT_TYPE_TRADE, intervals_s=(1, 2, 4), allowed_lateness_s=0)
+        aggregator.update(trade('btcusd', 0, 10.0, 1.0))
+        aggregator.update(trade('btcusd', 8, 11.0, 1.0))
+        aggregator.update(trade('btcusd', 1, 12.0, 1.0))  # late for all three intervals
+        self.assertEqual(aggregator.late_events, 1)
+
+    def test_source_watermarks(self):
+        aggregator = BarAggregator(EVENT_TYPE_QUOTE, intervals_s=(1, 60), allowed_lateness_s=0)
+        aggregator.update(quote('eurusd', 0, 1.0, 1.0))
+        # A source with future timestamps only closes its own bars
+        aggregator.update({**quote('btcusd', 0, 2.0, 2.0), 'source': 'webhook',
+                           'event_time': NY_TZ.localize(dtt(2030, 1, 1))})
+        aggregator.update({**quote('btcusd', 0, 3.0, 3.0), 'source': 'webhook'})
+        self.assertEqual(aggregator.drain(), [])
+        self.assertEqual(aggregator.late_events, 1)
+
+        aggregator.update(quote('eurusd', 0, 1.5, 1.5, 500_000))
+        aggregator.update(quote('eurusd', 1, 2.0, 2.0))
+        self.assertEqual(aggregator.late_events, 1)
+        bars = aggregator.drain()
+        self.assertEqual([(bar.source, bar.interval_s, bar.count) for bar in bars], [('tiingo_fx', 1, 2)])
+
+    def test_close_idle_sources(self):
+        now = [0.0]
+        aggregator = BarAggregator(EVENT_TYPE_TRADE, intervals_s=(1, 60), allowed_lateness_s=0, idle_timeout_s=5,
+                                   clock=lambda: now[0])
+        aggregator.update(trade('btcusd', 0, 10.0, 1.0))
+        now[0] = 3.0
+        aggregator.update({**trade('spy', 0, 20.0, 1.0), 'source': 'tiingo_iex'})
+        now[0] = 6.0
+        aggregator.close_idle_sources()
+        self.assertEqual({(bar.source, bar.interval_s) for bar in aggregator.drain()},
+                         {('tiingo_crypto', 1), ('tiingo_crypto', 60)})
+
+        # Events for the closed bars are late, later bars of the source are aggregated
+        aggregator.update(trade('btcusd', 30, 11.0, 1.0))
+        self.assertEqual(aggregator.late_events, 1)
+        aggregator.update(trade('btcusd', 31, 11.0, 1.0))
+        self.assertEqual(len(aggregator.open_bars), 3)  # spy 1s, spy 60s, btcusd 1s at 31s
+
+    def test_close_all_partial(self):
+        aggregator = BarAggregator(EVENT_TYPE_QUOTE, intervals_s=(1, 60), allowed_lateness_s=0)
+        aggregator.update(quote('eurusd', 0, 1.0, 1.0))
+        aggregator.update(quote('eurusd', 0, 3.0, 3.0, 500_000))
+        aggregator.close_all()
+        rows = bars_to_table(aggregator.drain(), EVENT_TYPE_QUOTE).to_pylist()
+        self.assertEqual([(row['interval_s'], row['partial']) for row in rows], [(1, True), (60, True)])
+        # Time weighting stops at the last event
+        self.assertEqual(rows[0]['twap'], 1.0)
+        self.assertEqual(aggregator.open_bars, {})
+
+    def test_save_bars_to_parquet(self):
+        aggregator = BarAggregator(EVENT_TYPE_TRADE, intervals_s=(1, 60), allowed_lateness_s=0)
+        aggregator.update(trade('btcusd', 0, 10.0, 1.0))
+        aggregator.advance_watermark('tiingo_crypto', aggregator.watermarks['tiingo_crypto'] + 120_000_000)
+
+        with tempfile.TemporaryDirectory() as pq_dir:
+            save_bars_to_parquet(aggregator.drain(), pq_dir, EVENT_TYPE_TRADE)
+            dataset = ds.dataset(pq_dir, format='parquet', partitioning='hive')
+            table = dataset.to_table(filter=ds.field('interval_s') == 60)
+            self.assertEqual(table.num_rows, 1)
+            self.assertEqual(table['symbol'].to_pylist(), ['btcusd'])
+            self.assertEqual(dataset.to_table().num_rows, 2)
+
+    async def test_aggregate_queue(self):
+        mock_queue = AsyncMock()
+        mock_queue.get = AsyncMock(side_effect=[
+            {'market_feed': trade('btcusd', 0, 10.0, 1.0)},
+            {'market_feed': None},
+            {'market_feed': trade('btcusd', 1, 10.0, 1.0)},
+            {'market_feed': trade('btcusd', 2, 10.0, 1.0)},
+            asyncio.CancelledError()
+        ])
+        mock_queue.task_done = MagicMock()
+        aggregator = BarAggregator(EVENT_TYPE_TRADE, intervals_s=(1,), allowed_lateness_s=0)
+        with patch('src.core.bar_aggregator.asyncio.to_thread', new_callable=AsyncMock) as mock_to_thread, \
+                patch('src.core.bar_aggregator.save_bars_to_parquet') as mock_save:
+            with self.assertRaises(asyncio.CancelledError):
+                await aggregate_queue(mock_queue, aggregator, flush_size=2)
+
+        mock_to_thread.assert_awaited_once()
+        self.assertEqual(len(mock_to_thread.call_args.args[1]), 2)
+        self.assertEqual([bar.partial for bar in mock_save.call_args.args[0]], [True])
+        self.assertEqual(mock_queue.task_done.call_count, 4)
+
+    async def test_aggregate_queue_max_age_flush(self):
+        queue = asyncio.Queue()
+        queue.put_nowait({'market_feed': trade('btcusd', 0, 10.0, 1.0)})
+        queue.put_nowait({'market_feed': trade('btcusd', 1, 10.0, 1.0)})
+        aggregator = BarAggregator(EVENT_TYPE_TRADE, intervals_s=(1,), allowed_lateness_s=0)
+        with patch('src.core.bar_aggregator.asyncio.to_thread', new_callable=AsyncMock) as mock_to_thread, \
+                patch('src.core.bar_aggregator.save_bars_to_parquet') as mock_save:
+            task = asyncio.create_task(aggregate_queue(queue, aggregator, flush_size=100, max_age_s=0.05))
+            await asyncio.wait_for(queue.join(), timeout=1)
+            self.assertEqual(mock_to_thread.await_count, 0)
+            for _ in range(50):
+                if mock_to_thread.await_count:
+                    break
+                await asyncio.sleep(0.01)
+            task.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+
+        mock_to_thread.assert_awaited_once()
+        self.assertEqual(len(mock_to_thread.call_args.args[1]), 1)
+        # The open bar is saved as partial on cancel
+        self.assertEqual([bar.partial for bar in mock_save.call_args.args[0]], [True])
+
+    async def test_aggregate_queue_saves_pending_bars_on_cancel(self):
+        mock_queue = AsyncMock()
+        mock_queue.get = AsyncMock(side_effect=[
+            {'market_feed': trade('btcusd', 0, 10.0, 1.0)},
+            {'market_feed': trade('btcusd', 1, 10.0, 1.0)},
+            asyncio.CancelledError()
+        ])
+        mock_queue.task_done = MagicMock()
+        aggregator = BarAggregator(EVENT_TYPE_TRADE, intervals_s=(1,), allowed_lateness_s=0)
+        with patch('src.core.bar_aggregator.save_bars_to_parquet') as mock_save:
+            with self.assertRaises(asyncio.CancelledError):
+                await aggregate_queue(mock_queue, aggregator, pq_dir='bars', flush_size=100)
+
+        mock_save.assert_called_once()
+        self.assertEqual([bar.partial for bar in mock_save.call_args.args[0]], [False, True])
+        self.assertEqual(mock_save.call_args.args[1:], ('bars', EVENT_TYPE_TRADE))
+        self.assertEqual(aggregator.closed_bars, [])
+
+    async def test_run_bar_aggregator(self):
+        with patch('src.core.bar_aggregator.asyncio.gather', new_callable=AsyncMock) as mock_gather, \
+                patch('src.core.bar_aggregator.subscribe') as mock_subscribe, \
+                patch('src.core.bar_aggregator.unsubscribe') as mock_unsubscribe:
+            await run_bar_aggregator()
+            mock_gather.assert_called_once()
+            self.assertEqual(mock_subscribe.call_count, 3)
+            self.assertEqual(mock_unsubscribe.call_count, 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,170 @@
+import asyncio
+import random
+import unittest
+from datetime import datetime as dtt, timedelta
+from unittest.mock import patch, AsyncMock, MagicMock
+
+from src import constants
+from src.constants import NY_TZ, EVENT_TYPE_BBO, SOURCE_BBO
+from src.core.bbo_engine import IndexedHeap, BBOEngine, run_bbo_engine
+
+
+def quote(exch, bid, ask, second=0, symbol='btcusd', bid_size=1.0, ask_size=2.0):
+    return {
+        'asset_type': constants.ASSET_TYPE_CRYPTO,
+        'event_type': constants.EVENT_TYPE_QUOTE,
+        'symbol': symbol,
+        'bid_size': bid_size,
+        'ask_size': ask_size,
+        'bid': bid,
+        'ask': ask,
+        'mid': (bid + ask) / 2,
+        'source': 'tiingo_crypto',
+        'exchange': exch,
+        'event_time': NY_TZ.localize(dtt(2026, 2, 14, 9, 30)) + timedelta(seconds=second),
+    }
+
+
+def bbo_fields(bbo):
+    return bbo['bid'], bbo['bid_exchange'], bbo['ask'], bbo['ask_exchange']
+
+
+class TestIndexedHeap(unittest.TestCase):
+    def test_push_update_remove(self):
+        heap = IndexedHeap()
+        for key, priority in [('a', 5), ('b', 3), ('c', 8), ('d', 1)]:
+            heap.push(key, priority)
+        self.assertEqual(heap.peek(), 'd')
+        heap.push('d', 9)
+        self.assertEqual(heap.peek(), 'b')
+        heap.remove('b')
+        self.assertEqual(heap.peek(), 'a')
+        heap.remove('missing')
+        self.assertEqual(len(heap), 3)
+        self.assertNotIn('b', heap)
+
+    def test_matches_rescan(self):
+        rng = random.Random(7)
+        heap = IndexedHeap()
+        priorities = {}
+        for _ in range(2000):
+            key = rng.randrange(20)
+            if rng.random() < 0.2:
+                heap.remove(key)
+                priorities.pop(key, None)
+            else:
+                priorities[key] = (rng.random(), key)
+                heap.push(key, priorities[key])
+            expected = min(priorities, key=priorities.get) if priorities else None
+            self.assertEqual(heap.peek(), expected)
+            self.assertEqual({key: i for i, (_, key) in enumerate(heap.heap)}, heap.pos)
+
+
+class TestBBOEngine(unittest.IsolatedAsyncioTestCase):
+    def test_best_bid_and_ask_across_venues(self):
+        engine = BBOEngine()
+        bbos = engine.update(quote('gdax', 100.0, 101.0))
+        self.assertEqual(bbo_fields(bbos[0]), (100.0, 'gdax', 101.0, 'gdax'))
+        self.assertEqual(bbos[0]['event_type'], EVENT_TYPE_BBO)
+        self.assertEqual(bbos[0]['source'], SOURCE_BBO)
+
+        bbos = engine.update(quote('kraken', 100.5, 101.5, bid_size=3.0))
+        self.assertEqual(bbo_fields(bbos[0]), (100.5, 'kraken', 101.0, 'gdax'))
+        self.assertEqual(bbos[0]['bid_size'], 3.0)
+        self.assertEqual(bbos[0]['mid'], 100.75)
+        self.assertEqual(bbos[0]['num_venues'], 2)
+
+        bbos = engine.update(quote('kraken', 99.0, 100.8, second=1))
+        self.assertEqual(bbo_fields(bbos[0]), (100.0, 'gdax', 100.8, 'kraken'))
+
+    def test_no_emit_when_bbo_unchanged(self):
+        engine = BBOEngine()
+        engine.update(quote('gdax', 100.0, 101.0))
+        self.assertEqual(engine.update(quote('kraken', 99.0, 102.0)), [])
+        self.assertEqual(engine.update(quote('gdax', 100.0, 101.0, second=1)), [])
+
+    def test_time_priority_on_equal_price(self):
+        engine = BBOEngine()
+        engine.update(quote('gdax', 100.0, 101.0))
+        engine.update(quote('kraken', 100.0, 101.0, second=1))
+        self.assertEqual(engine.books['btcusd'].get_bbo()[2], 'gdax')
+
+        bbos = engine.update(quote('gdax', 99.0, 101.0, second=2))
+        self.assertEqual(bbo_fields(bbos[0]), (100.0, 'kraken', 101.0, 'gdax'))
+
+    def test_stale_venue_expiry(self):
+        engine = BBOEngine(stale_after_s=5)
+        engine.update(quote('gdax', 100.5, 101.0))
+        engine.update(quote('kraken', 100.0, 101.5, second=3))
+
+        bbos = engine.update(quote('kraken', 100.0, 101.5, symbol='ethusd', second=6))
+        btc_bbo = [bbo for bbo in bbos if bbo['symbol'] == 'btcusd'][0]
+        self.assertEqual(bbo_fields(btc_bbo), (100.0, 'kraken', 101.5, 'kraken'))
+        self.assertNotIn('gdax', engine.books['btcusd'].quotes)
+
+    def test_refreshed_venue_not_expired(self):
+        engine = BBOEngine(stale_after_s=5)
+        engine.update(quote('gdax', 100.5, 101.0))
+        engine.update(quote('gdax', 100.5, 101.0, second=4))
+        engine.update(quote('kraken', 100.0, 101.5, second=6))
+        self.assertIn('gdax', engine.books['btcusd'].quotes)
+
+    def test_out_of_order_venue_update_ignored(self):
+        engine = BBOEngine(stale_after_s=5)
+        engine.update(quote('gdax', 100.5, 101.0, second=4))
+        self.assertEqual(engine.update(quote('gdax', 99.0, 102.0, second=1)), [])
+        self.assertEqual(engine.books['btcusd'].get_bbo()[0], 100.5)
+
+        # Expiry follows the newest gdax quote at 4s, not the older one at 1s
+        engine.update(quote('kraken', 100.0, 101.5, second=7))
+        self.assertIn('gdax', engine.books['btcusd'].quotes)
+        engine.update(quote('kraken', 100.0, 101.5, second=9))
+        self.assertNotIn('gdax', engine.books['btcusd'].quotes)
+
+    def test_expiry_heap_entry_per_venue(self):
+        engine = BBOEngine(stale_after_s=5)
+        for second in range(20):
+            engine.update(quote('gdax', 100.0 + second, 101.0 + second, second=second))
+            engine.update(quote('kraken', 100.0, 101.0, second=second, symbol='ethusd'))
+        self.assertEqual(len(engine.expiry_heap), 2)
+        self.assertEqual(set(engine.books['btcusd'].quotes), {'gdax'})
+
+    def test_created_at_shared(self):
+        engine = BBOEngine()
+        created_at = NY_TZ.localize(dtt(2026, 2, 14, 9, 30, 5))
+        bbos = engine.update(quote('gdax', 100.0, 101.0), created_at)
+        self.assertEqual(bbos[0]['created_at'], created_at)
+
+    def test_venue_falls_back_to_source(self):
+        engine = BBOEngine()
+        data = quote(None, 1.1, 1.2)
+        data['source'] = 'tiingo_fx'
+        bbos = engine.update(data)
+        self.assertEqual(bbos[0]['bid_exchange'], 'tiingo_fx')
+
+    async def test_run_bbo_engine(self):
+        mock_queue = AsyncMock()
+        mock_queue.get = AsyncMock(side_effect=[
+            {'market_feed': quote('gdax', 100.0, 101.0)},
+            {'market_feed': None},
+            {'market_feed': quote('kraken', 99.0, 102.0)},
+            {'market_feed': quote('kraken', 100.5, 102.0)},
+            asyncio.CancelledError()
+        ])
+        mock_queue.task_done = MagicMock()
+        mock_queue.empty = MagicMock(return_value=True)
+        bbo_queue = asyncio.Queue()
+        with patch('src.core.bbo_engine.subscribe', return_value=mock_queue), \
+                patch('src.core.bbo_engine.unsubscribe') as mock_unsubscribe, \
+                patch('src.core.bbo_engine.bbo_queue', bbo_queue):
+            with self.assertRaises(asyncio.CancelledError):
+                await run_bbo_engine()
+
+        self.assertEqual(bbo_queue.qsize(), 2)
+        self.assertEqual(bbo_queue.get_nowait()['market_feed']['bid'], 100.0)
+        self.assertEqual(bbo_queue.get_nowait()['market_feed']['bid_exchange'], 'kraken')
+        mock_unsubscribe.assert_called_once()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,89 @@
+import unittest
+from datetime import datetime as dtt
+
+from src.constants import NY_TZ
+from src.core.event_reorderer import EventReorderer
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def event(second, source='tiingo_crypto'):
+    return {'symbol': 'btcusd', 'source': source, 'event_time': NY_TZ.localize(dtt(2026, 2, 14, 9, 30, second))}
+
+
+def seconds(events):
+    return [data['event_time'].second for data in events]
+
+
+class TestEventReorderer(unittest.TestCase):
+    def test_emits_in_event_time_order(self):
+        reorderer = EventReorderer(allowed_lateness_s=2, clock=FakeClock())
+        emitted = []
+        for second in [3, 1, 2, 6, 4, 5, 10]:
+            ready, late = reorderer.push(event(second))
+            self.assertEqual(late, [])
+            emitted += ready
+        self.assertEqual(seconds(emitted), [1, 2, 3, 4, 5, 6])
+        self.assertEqual(seconds(reorderer.flush()), [10])
+
+    def test_late_events(self):
+        reorderer = EventReorderer(allowed_lateness_s=1, clock=FakeClock())
+        reorderer.push(event(5))
+        ready, late = reorderer.push(event(2))
+        self.assertEqual(seconds(late), [2])
+        self.assertEqual(reorderer.late_events, 1)
+
+        ready, late = reorderer.push(event(4))  # equal to the watermark, not late
+        self.assertEqual(late, [])
+        self.assertEqual(seconds(ready), [4])
+
+    def test_per_source_watermarks(self):
+        reorderer = EventReorderer(allowed_lateness_s=0, clock=FakeClock())
+        self.assertEqual(seconds(reorderer.push(event(1, 'fast'))[0]), [1])
+        self.assertEqual(reorderer.push(event(2, 'slow'))[0], [])  # fast source watermark still at 1
+        self.assertEqual(reorderer.push(event(5, 'fast'))[0], [event(2, 'slow')])
+        self.assertEqual(reorderer.push(event(4, 'slow'))[0], [event(4, 'slow')])
+        self.assertEqual(reorderer.watermark_us, reorderer.get_watermark())
+
+    def test_idle_source_does_not_hold_back_watermark(self):
+        clock = FakeClock()
+        reorderer = EventReorderer(allowed_lateness_s=0, idle_timeout_s=5, clock=clock)
+        reorderer.push(event(1, 'idle'))
+        reorderer.push(event(3, 'active'))
+        self.assertEqual(reorderer.heap[0][2], event(3, 'active'))
+
+        clock.now = 10.0
+        self.assertEqual(seconds(reorderer.push(event(4, 'active'))[0]), [3, 4])
+        self.assertEqual(reorderer.push(event(2, 'idle'))[1], [event(2, 'idle')])
+
+        clock.now = 20.0
+        self.assertEqual(seconds(reorderer.push(event(8, 'idle'))[0]), [8])
+
+    def test_all_sources_idle_releases_pending_events(self):
+        clock = FakeClock()
+        reorderer = EventReorderer(allowed_lateness_s=10, idle_timeout_s=5, clock=clock)
+        reorderer.push(event(1))
+        reorderer.push(event(3))
+        self.assertEqual(reorderer.pop_ready(), [])
+
+        clock.now = 10.0
+        self.assertEqual(seconds(reorderer.pop_ready()), [1, 3])
+        self.assertEqual(reorderer.heap, [])
+
+    def test_max_pending(self):
+        reorderer = EventReorderer(allowed_lateness_s=60, max_pending=2, clock=FakeClock())
+        reorderer.push(event(3))
+        reorderer.push(event(1))
+        ready, late = reorderer.push(event(2))
+        self.assertEqual(seconds(ready), [1])
+        self.assertEqual(seconds(reorderer.push(event(0))[1]), [0])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,157 @@
+import json
+import os
+import tempfile
+import threading
+import unittest
+from unittest.mock import patch
+from datetime import datetime as dtt
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from src.constants import NY_TZ
+from src.core.feed_index import build_row_group_entries, add_file_to_index, load_index, rebuild_index, \
+    lookup_row_groups, get_index_fp, get_index_log_fp, _index_cache
+from src.utils import to_epoch_us
+
+
+def make_table(rows):
+    return pa.Table.from_pylist([
+        {'symbol': symbol, 'source': source, 'event_time': NY_TZ.localize(dtt(2026, 2, 14, 9, 30, second))}
+        for symbol, source, second in rows
+    ])
+
+
+class TestFeedIndex(unittest.TestCase):
+    def test_build_row_group_entries(self):
+        table = make_table([('spy', 'tiingo_iex', 0), ('aapl', 'tiingo_iex', 1), ('btcusd', 'tiingo_crypto', 2)])
+        entries = build_row_group_entries(table, [2, 1])
+
+        self.assertEqual(len(entries), 2)
+        self.assertEqual(entries[0]['symbols'], ['aapl', 'spy'])
+        self.assertEqual(entries[0]['sources'], ['tiingo_iex'])
+        self.assertEqual(entries[0]['min_event_time'], to_epoch_us(NY_TZ.localize(dtt(2026, 2, 14, 9, 30, 0))))
+        self.assertEqual(entries[0]['max_event_time'], to_epoch_us(NY_TZ.localize(dtt(2026, 2, 14, 9, 30, 1))))
+        self.assertEqual(entries[1]['symbols'], ['btcusd'])
+        self.assertEqual(entries[1]['num_rows'], 1)
+
+    def test_build_row_group_entries_non_timestamp_event_time(self):
+        table = pa.Table.from_pylist([{'symbol': 'spy', 'source': 'feed1', 'event_time': '2026-02-14T09:30:00'}])
+        entries = build_row_group_entries(table, [1])
+        self.assertIsNone(entries[0]['min_event_time'])
+        self.assertIsNone(entries[0]['max_event_time'])
+
+    def test_add_file_and_lookup(self):
+        with tempfile.TemporaryDirectory() as pq_dir:
+            early = make_table([('spy', 'tiingo_iex', 0), ('aapl', 'tiingo_iex', 1)])
+            late = make_table([('btcusd', 'tiingo_crypto', 30), ('spy', 'tiingo_iex', 40)])
+            add_file_to_index(pq_dir, 'trade', 'consol_feeds_trade_1.parquet', build_row_group_entries(early, [1, 1]))
+            add_file_to_index(pq_dir, 'trade', 'consol_feeds_trade_2.parquet', build_row_group_entries(late, [2]))
+
+            index = load_index(pq_dir, 'trade')
+            self.assertEqual(set(index['files']), {'consol_feeds_trade_1.parquet', 'consol_feeds_trade_2.parquet'})
+
+            self.assertEqual(lookup_row_groups(index, symbols=['aapl']), {'consol_feeds_trade_1.parquet': [1]})
+            self.assertEqual(lookup_row_groups(index, symbols=['spy']),
+                             {'consol_feeds_trade_1.parquet': [0], 'consol_feeds_trade_2.parquet': [0]})
+            self.assertEqual(lookup_row_groups(index, start=NY_TZ.localize(dtt(2026, 2, 14, 9, 30, 20))),
+                             {'consol_feeds_trade_2.parquet': [0]})
+            self.assertEqual(lookup_row_groups(index, source='tiingo_crypto'), {'consol_feeds_trade_2.parquet': [0]})
+            self.assertEqual(lookup_row_groups(index, symbols=['eurusd']), {})
+
+    def test_add_file_appends_to_log(self):
+        with tempfile.TemporaryDirectory() as pq_dir:
+            rebuild_index(pq_dir, 'trade')
+            with open(get_index_fp(pq_dir, 'trade')) as f:
+                snapshot = f.read()
+            entries = build_row_group_entries(make_table([('spy', 'tiingo_iex', 0)]), [1])
+            add_file_to_index(pq_dir, 'trade', 'consol_feeds_trade_1.parquet', entries)
+            add_file_to_index(pq_dir, 'trade', 'consol_feeds_trade_2.parquet', entries)
+
+            with open(get_index_fp(pq_dir, 'trade')) as f:
+                self.assertEqual(f.read(), snapshot)
+            with open(get_index_log_fp(pq_dir, 'trade')) as f:
+                self.assertEqual(len(f.readlines()), 2)
+
+            cached_index = load_index(pq_dir, 'trade')
+            self.assertEqual(len(cached_index['files']), 2)
+            _index_cache.clear()
+            self.assertEqual(load_index(pq_dir, 'trade'), cached_index)
+
+    def test_load_index_applies_new_log_lines(self):
+        with tempfile.TemporaryDirectory() as pq_dir:
+            entries = build_row_group_entries(make_table([('spy', 'tiingo_iex', 0)]), [1])
+            add_file_to_index(pq_dir, 'quote', 'consol_feeds_quote_1.parquet', entries)
+            index = load_index(pq_dir, 'quote')
+            with open(get_index_log_fp(pq_dir, 'quote'), 'a') as f:
+                f.write('{"file":"consol_feeds_quote_2.parquet","row_groups":[]}\n{"file":"partial')
+
+            new_index = load_index(pq_dir, 'quote')
+            self.assertEqual(list(new_index['files']),
+                             ['consol_feeds_quote_1.parquet', 'consol_feeds_quote_2.parquet'])
+            # An index already returned is left unchanged
+            self.assertEqual(list(index['files']), ['consol_feeds_quote_1.parquet'])
+            self.assertIs(load_index(pq_dir, 'quote'), new_index)
+
+            rebuild_index(pq_dir, 'quote')
+            self.assertFalse(os.path.exists(get_index_log_fp(pq_dir, 'quote')))
+            self.assertEqual(load_index(pq_dir, 'quote')['files'], {})
+
+    def test_lookup_while_indexing(self):
+        with tempfile.TemporaryDirectory() as pq_dir:
+            entries = build_row_group_entries(make_table([('spy', 'tiingo_iex', 0)]), [1])
+            with open(get_index_log_fp(pq_dir, 'trade'), 'w') as f:
+                for i in range(5000):
+                    f.write(json.dumps({'file': f'consol_feeds_trade_{i}.parquet', 'row_groups': entries}) + '\n')
+            stop = threading.Event()
+
+            def index_files():
+                i = 5000
+                while not stop.is_set():
+                    add_file_to_index(pq_dir, 'trade', f'consol_feeds_trade_{i}.parquet', entries)
+                    i += 1
+
+            writer = threading.Thread(target=index_files)
+            writer.start()
+            try:
+                for _ in range(30):
+                    lookup_row_groups(load_index(pq_dir, 'trade'), symbols=['spy'])
+            finally:
+                stop.set()
+                writer.join()
+
+    def test_compact_index_log(self):
+        with tempfile.TemporaryDirectory() as pq_dir:
+            entries = build_row_group_entries(make_table([('spy', 'tiingo_iex', 0)]), [1])
+            open(os.path.join(pq_dir, 'consol_feeds_trade_1.parquet'), 'w').close()
+            with patch('src.core.feed_index.INDEX_LOG_COMPACT_BYTES', 200):
+                add_file_to_index(pq_dir, 'trade', 'consol_feeds_trade_1.parquet', entries)
+                self.assertTrue(os.path.exists(get_index_log_fp(pq_dir, 'trade')))
+                add_file_to_index(pq_dir, 'trade', 'consol_feeds_trade_2.parquet', entries)
+
+            # consol_feeds_trade_2.parquet does not exist and is dropped by the compaction
+            self.assertFalse(os.path.exists(get_index_log_fp(pq_dir, 'trade')))
+            with open(get_index_fp(pq_dir, 'trade')) as f:
+                self.assertEqual(list(json.load(f)['files']), ['consol_feeds_trade_1.parquet'])
+            self.assertEqual(list(load_index(pq_dir, 'trade')['files']), ['consol_feeds_trade_1.parquet'])
+
+    def test_load_index_missing(self):
+        with tempfile.TemporaryDirectory() as pq_dir:
+            self.assertEqual(load_index(pq_dir, 'quote')['files'], {})
+
+    def test_rebuild_index(self):
+        with tempfile.TemporaryDirectory() as pq_dir:
+            table = make_table([('spy', 'tiingo_iex', 0), ('aapl', 'tiingo_iex', 1), ('msft', 'tiingo_iex', 2)])
+            pq.write_table(table, os.path.join(pq_dir, 'consol_feeds_ref_px_1.parquet'), row_group_size=2)
+            pq.write_table(table, os.path.join(pq_dir, 'consol_feeds_quote_1.parquet'))
+
+            index = rebuild_index(pq_dir, 'ref_px')
+
+            self.assertEqual(list(index['files']), ['consol_feeds_ref_px_1.parquet'])
+            row_groups = index['files']['consol_feeds_ref_px_1.parquet']['row_groups']
+            self.assertEqual([rg['symbols'] for rg in row_groups], [['aapl', 'spy'], ['msft']])
+            with open(get_index_fp(pq_dir, 'ref_px')) as f:
+                self.assertEqual(json.load(f), index)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,101 @@
+import io
+import json
+import os
+import tempfile
+import unittest
+from datetime import datetime as dtt
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from src.constants import NY_TZ
+from src.core.feed_index import rebuild_index
+from src.core.feed_query import query_feeds, get_fragments, stream_arrow_ipc, stream_ndjson
+from src.core.raw_feed_consolidator import save_to_parquet
+
+
+def make_event(symbol, source, second, exchange=None):
+    return {
+        'symbol': symbol,
+        'source': source,
+        'exchange': exchange,
+        'last_price': 1.0 + second,
+        'event_time': NY_TZ.localize(dtt(2026, 2, 14, 9, 30, second)),
+    }
+
+
+class TestFeedQuery(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.pq_dir = self.tmp_dir.name
+        events_1 = [make_event('btcusd', 'tiingo_crypto', 0), make_event('ethusd', 'tiingo_crypto', 1),
+                    make_event('spy', 'tiingo_iex', 2)]
+        events_2 = [make_event('btcusd', 'tiingo_crypto', 40, 'kraken'), make_event('solusd', 'tiingo_crypto', 41, 'gdax')]
+        for events in (events_1, events_2):
+            buffer = {(e['source'], e['symbol'], e['event_time']): e for e in events}
+            save_to_parquet(buffer, self.pq_dir, 'trade', row_group_size=2)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_query_by_symbol(self):
+        schema, batches = query_feeds('trade', symbols=['btcusd'], pq_dir=self.pq_dir)
+        table = pa.Table.from_batches(list(batches), schema=schema)
+        self.assertEqual(table.num_rows, 2)
+        self.assertEqual(table['exchange'].to_pylist(), [None, 'kraken'])
+
+    def test_query_by_time_range_and_source(self):
+        schema, batches = query_feeds('trade', start=NY_TZ.localize(dtt(2026, 2, 14, 9, 30, 1)),
+                                      end=NY_TZ.localize(dtt(2026, 2, 14, 9, 30, 40)), source='tiingo_crypto',
+                                      columns=['symbol', 'last_price'], pq_dir=self.pq_dir)
+        table = pa.Table.from_batches(list(batches), schema=schema)
+        self.assertEqual(table.column_names, ['symbol', 'last_price'])
+        self.assertEqual(sorted(table['symbol'].to_pylist()), ['btcusd', 'ethusd'])
+
+    def test_query_columns(self):
+        with self.assertRaises(ValueError):
+            query_feeds('trade', columns=['symbol', 'unknown'], pq_dir=self.pq_dir)
+        schema, batches = query_feeds('trade', columns=[], pq_dir=self.pq_dir)
+        self.assertEqual(schema.names, [])
+
+    def test_get_fragments_skips_files_using_index(self):
+        fragments = get_fragments(self.pq_dir, 'trade', symbols=['solusd'])
+        self.assertEqual(len(fragments), 1)
+        self.assertEqual(fragments[0].row_groups[0].id, 0)
+        self.assertIn('consol_feeds_trade_', os.path.basename(fragments[0].path))
+
+        fragments = get_fragments(self.pq_dir, 'trade', symbols=['spy'])
+        self.assertEqual(len(fragments), 1)
+        self.assertEqual([rg.id for rg in fragments[0].row_groups], [1])
+
+    def test_get_fragments_unindexed_files_scanned(self):
+        table = pa.Table.from_pylist([make_event('spy', 'tiingo_iex', 5)])
+        pq.write_table(table, os.path.join(self.pq_dir, 'consol_feeds_trade_unindexed.parquet'))
+        fragments = get_fragments(self.pq_dir, 'trade', symbols=['spy'])
+        self.assertEqual(len(fragments), 2)
+
+        rebuild_index(self.pq_dir, 'trade')
+        schema, batches = query_feeds('trade', symbols=['spy'], pq_dir=self.pq_dir)
+        self.assertEqual(sum(batch.num_rows for batch in batches), 2)
+
+    def test_query_no_matching_files(self):
+        schema, batches = query_feeds('quote', symbols=['btcusd'], pq_dir=self.pq_dir)
+        self.assertEqual(list(batches), [])
+
+    def test_stream_arrow_ipc(self):
+        schema, batches = query_feeds('trade', pq_dir=self.pq_dir, batch_size=1)
+        payload = b''.join(stream_arrow_ipc(schema, batches))
+        table = pa.ipc.open_stream(io.BytesIO(payload)).read_all()
+        self.assertEqual(table.num_rows, 5)
+
+    def test_stream_ndjson(self):
+        schema, batches = query_feeds('trade', symbols=['ethusd'], pq_dir=self.pq_dir)
+        lines = b''.join(stream_ndjson(batches)).decode().splitlines()
+        self.assertEqual(len(lines), 1)
+        row = json.loads(lines[0])
+        self.assertEqual(row['symbol'], 'ethusd')
+        self.assertEqual(dtt.fromisoformat(row['event_time']), make_event('ethusd', 'tiingo_crypto', 1)['event_time'])
+        self.assertIn('T', row['event_time'])
+
+
+if __name__ == '__main__':
+    unittest.main()
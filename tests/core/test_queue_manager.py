@@ -0,0 +1,30 @@
+import asyncio
+import unittest
+
+from src.core.queue_manager import subscribe, unsubscribe, publish, subscribers
+
+
+class TestQueueManager(unittest.TestCase):
+    def test_publish_to_subscribers(self):
+        queue_1 = subscribe('test_event')
+        queue_2 = subscribe('test_event', maxsize=1)
+        try:
+            publish('test_event', {'market_feed': 1})
+            publish('test_event', {'market_feed': 2})
+
+            self.assertEqual(queue_1.qsize(), 2)
+            self.assertEqual(queue_2.qsize(), 1)  # bounded subscriber drops the second message
+            self.assertEqual(queue_2.get_nowait(), {'market_feed': 1})
+        finally:
+            unsubscribe('test_event', queue_1)
+            unsubscribe('test_event', queue_2)
+        self.assertEqual(subscribers['test_event'], [])
+
+    def test_publish_without_subscribers(self):
+        publish('no_subscriber_event', {'market_feed': 1})
+        unsubscribe('no_subscriber_event', asyncio.Queue())
+        self.assertEqual(subscribers['no_subscriber_event'], [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -2,6 +2,9 @@ import os
 import unittest
 from unittest.mock import patch, AsyncMock, MagicMock
 import asyncio
+import tempfile
+from datetime import datetime as dtt
+import pyarrow.parquet as pq
 from src import constants
 from src.constants import VENDOR_TIINGO
 from src.core.raw_feed_consolidator import consolidate_queue, run_consolidator, save_to_parquet
@@ -9,9 +12,10 @@ from src.core.raw_feed_consolidator import consolidate_queue, run_consolidator,
 
 class TestRawFeedConsolidator(unittest.IsolatedAsyncioTestCase):
 
+    @patch("src.core.raw_feed_consolidator.add_file_to_index")
     @patch("src.core.raw_feed_consolidator.pq.write_table")
     @patch("src.core.raw_feed_consolidator.dtt")
-    def test_save_to_parquet(self, mock_dtt, mock_write_table):
+    def test_save_to_parquet(self, mock_dtt, mock_write_table, mock_add_file_to_index):
         buffer = {
             ("feed1", "AAPL", "2026-02-14T09:30:00"): {
                 "source": "feed1",
@@ -39,6 +43,8 @@ class TestRawFeedConsolidator(unittest.IsolatedAsyncioTestCase):
         pq_fp = args[1]
         self.assertIn("consol_feeds_trade_20260214_093000_123456.parquet", pq_fp)
         self.assertTrue(kwargs["compression"] == "snappy")
+        mock_add_file_to_index.assert_called_once()
+        self.assertEqual(mock_add_file_to_index.call_args.args[2], pq_fp)
         self.assertEqual(len(buffer), 0)
         self.assertTrue(os.path.exists(pq_dir) or True)  # safe check; actual dir may not be created in mock
 
@@ -46,6 +52,7 @@ class TestRawFeedConsolidator(unittest.IsolatedAsyncioTestCase):
         event_type = "trade"
         pq_dir = "dummy_dir"
         buffer_size = 2
+        event_time = constants.NY_TZ.localize(dtt(2026, 2, 14, 9, 30))
 
         data1 = {
             'asset_type': constants.ASSET_TYPE_STK,
@@ -54,7 +61,7 @@ class TestRawFeedConsolidator(unittest.IsolatedAsyncioTestCase):
             'price': 10.735,
             'vendor': VENDOR_TIINGO,
             'source': 'tiingo_iex',
-            'event_time': '2026-02-14T09:30:00',
+            'event_time': event_time,
             'created_at': '2026-02-14T09:30:00'
         }
         data2 = {
@@ -64,7 +71,7 @@ class TestRawFeedConsolidator(unittest.IsolatedAsyncioTestCase):
             'price': 10.735,
             'vendor': VENDOR_TIINGO,
             'source': 'tiingo_iex',
-            'event_time': '2026-02-14T09:30:00',
+            'event_time': event_time,
             'created_at': '2026-02-14T09:30:00'
         }
         data3 = {
@@ -74,7 +81,7 @@ class TestRawFeedConsolidator(unittest.IsolatedAsyncioTestCase):
             'price': 10.735,
             'vendor': VENDOR_TIINGO,
             'source': 'tiingo_iex',
-            'event_time': '2026-02-14T09:30:00',
+            'event_time': event_time,
             'created_at': '2026-02-14T09:30:00'
         }
 
@@ -92,10 +99,67 @@ class TestRawFeedConsolidator(unittest.IsolatedAsyncioTestCase):
             mock_to_thread.return_value = fut
 
             with self.assertRaises(asyncio.CancelledError):
-                await consolidate_queue(mock_queue, pq_dir=pq_dir, buffer_size=2, event_type=event_type)
+                await consolidate_queue(mock_queue, pq_dir=pq_dir, buffer_size=2, event_type=event_type,
+                                        allowed_lateness_s=0)
 
             self.assertEqual(mock_to_thread.call_count, 1)
 
+    async def test_consolidate_queue_reorders_and_routes_late_events(self):
+        def event(second, source='tiingo_crypto'):
+            return {'market_feed': {
+                'symbol': 'btcusd',
+                'source': source,
+                'last_price': float(second),
+                'event_time': constants.NY_TZ.localize(dtt(2026, 2, 14, 9, 30, second)),
+            }}
+
+        mock_queue = AsyncMock()
+        mock_queue.get = AsyncMock(side_effect=[
+            event(3), event(1), event(2), event(5, 'other'), event(4, 'other'), event(9), event(10, 'other'),
+            event(0), event(20), event(20, 'other'), asyncio.CancelledError()
+        ])
+        mock_queue.task_done = MagicMock()
+        with tempfile.TemporaryDirectory() as pq_dir:
+            with self.assertRaises(asyncio.CancelledError):
+                await consolidate_queue(mock_queue, event_type='trade', pq_dir=pq_dir, buffer_size=1,
+                                        allowed_lateness_s=2)
+
+            files = sorted(f for f in os.listdir(pq_dir) if f.endswith('.parquet'))
+            prices = [px for f in files for px in pq.read_table(os.path.join(pq_dir, f))['last_price'].to_pylist()]
+            late_files = [f for f in os.listdir(os.path.join(pq_dir, 'late')) if f.endswith('.parquet')]
+            late_prices = [px for f in late_files
+                           for px in pq.read_table(os.path.join(pq_dir, 'late', f))['last_price'].to_pylist()]
+
+        self.assertEqual(prices, sorted(prices))
+        # Events at 20s are held back by the watermark and saved on cancellation
+        self.assertEqual(prices, [1.0, 2.0, 3.0, 4.0, 5.0, 9.0, 10.0, 20.0, 20.0])
+        self.assertEqual(late_prices, [0.0])
+
+    async def test_consolidate_queue_saves_pending_events_on_cancel(self):
+        def event(second, source='tiingo_crypto'):
+            return {'market_feed': {
+                'symbol': 'btcusd',
+                'source': source,
+                'last_price': float(second),
+                'event_time': constants.NY_TZ.localize(dtt(2026, 2, 14, 9, 30, second)),
+            }}
+
+        mock_queue = AsyncMock()
+        mock_queue.get = AsyncMock(side_effect=[event(10), event(11), event(1), asyncio.CancelledError()])
+        mock_queue.task_done = MagicMock()
+        with tempfile.TemporaryDirectory() as pq_dir:
+            with self.assertRaises(asyncio.CancelledError):
+                await consolidate_queue(mock_queue, event_type='trade', pq_dir=pq_dir, buffer_size=100,
+                                        allowed_lateness_s=5)
+
+            files = [f for f in os.listdir(pq_dir) if f.endswith('.parquet')]
+            late_files = [f for f in os.listdir(os.path.join(pq_dir, 'late')) if f.endswith('.parquet')]
+            self.assertEqual(len(files), 1)
+            self.assertEqual(pq.read_table(os.path.join(pq_dir, files[0]))['last_price'].to_pylist(), [10.0, 11.0])
+            self.assertEqual(len(late_files), 1)
+            self.assertEqual(pq.read_table(os.path.join(pq_dir, 'late', late_files[0]))['last_price'].to_pylist(),
+                             [1.0])
+
     async def test_run_consolidator(self):
         with patch("src.core.raw_feed_consolidator.asyncio.gather", new_callable=AsyncMock) as mock_gather:
             await run_consolidator()
@@ -0,0 +1,104 @@
+import json
+import unittest
+
+from src.data.sources.tiingo_decoders import TiingoFrameDecoder, IexRefPx, FxQuote, CryptoTrade, CryptoQuote, \
+    IEX_DECODER, FX_DECODER, CRYPTO_DECODER, GENERIC_DECODER
+
+HEARTBEAT = '{"messageType":"H","response":{"code":200,"message":"HeartBeat"}}'
+INIT = '{"messageType":"I","data":{"subscriptionId":61},"response":{"code":200,"message":"Success"}}'
+IEX_FRAME = '{"service":"iex","messageType":"A","data":["2026-02-13T12:37:36.425451499-05:00","spy",10.7]}'
+FX_FRAME = ('{"service":"fx","messageType":"A","data":["Q","eurnok","2026-02-13T16:35:45.725000+00:00",'
+            '100000,11.58626,11.590365,100000.0,11.59447]}')
+CRYPTO_TRADE_FRAME = ('{"service":"crypto_data","messageType":"A","data":["T","eurusd",'
+                      '"2026-02-13T17:37:32.177890+00:00","kraken",49.1372016,1.174045259378473]}')
+CRYPTO_QUOTE_FRAME = ('{"service":"crypto_data","messageType":"A","data":["Q","btceth",'
+                      '"2026-02-13T16:35:45.725000+00:00","gdax",100000.0,11.58626,11.590365,null,11.59447]}')
+
+
+def json_loads_path(frame):
+    """
+    Previous decoding path of tiingo_ws_request
+    """
+    msg_json = json.loads(frame)
+    if msg_json and msg_json.get('messageType') not in ('I', 'H'):
+        return msg_json.get('data')
+    return None
+
+
+class TestTiingoDecoders(unittest.TestCase):
+    def test_skips_heartbeat_and_init_frames(self):
+        for decoder in (IEX_DECODER, FX_DECODER, CRYPTO_DECODER, GENERIC_DECODER):
+            self.assertIsNone(decoder.decode(HEARTBEAT))
+            self.assertIsNone(decoder.decode(INIT))
+            self.assertIsNone(decoder.decode('{"response": {"code": 200}, "messageType" : "H"}'))
+
+    def test_typed_records(self):
+        record = IEX_DECODER.decode(IEX_FRAME)
+        self.assertIsInstance(record, IexRefPx)
+        self.assertEqual(record, IexRefPx('2026-02-13T12:37:36.425451499-05:00', 'spy', 10.7))
+
+        record = FX_DECODER.decode(FX_FRAME.encode())
+        self.assertIsInstance(record, FxQuote)
+        self.assertEqual(record.bid_size, 100000.0)
+        self.assertIsInstance(record.bid_size, float)
+        self.assertEqual(record.ask, 11.59447)
+
+        trade = CRYPTO_DECODER.decode(CRYPTO_TRADE_FRAME)
+        quote = CRYPTO_DECODER.decode(CRYPTO_QUOTE_FRAME)
+        self.assertIsInstance(trade, CryptoTrade)
+        self.assertEqual((trade.exch, trade.last_price), ('kraken', 1.174045259378473))
+        self.assertIsInstance(quote, CryptoQuote)
+        self.assertIsNone(quote.ask_size)
+
+    def test_matches_json_loads_path(self):
+        frames = [
+            HEARTBEAT, INIT, IEX_FRAME, FX_FRAME, CRYPTO_TRADE_FRAME, CRYPTO_QUOTE_FRAME,
+            '{ "messageType" : "A", "data" : [ "T", "btcusd", "2026-02-13", "gdax", 1, 2.5e3 ] }',
+            '{"data":["T","a,b","2026-02-13","gd\\"ax",1,2],"messageType":"A"}',
+            '{"messageType":"A","data":["Q","btcusd","2026-02-13","gdax",1,2,3]}',
+            '{"messageType":"A","data":[]}',
+            '{"messageType":"E","response":{"code":401,"message":"Unauthorized"}}',
+            '{"messageType":"A","data":[["nested"],{"a":1}]}',
+            '{"messageType":"A","data":[true,false,null,-1,"x"]}',
+            '{"messageType":"E","response":{"code":400,"message":"bad \\"data\\":[1,2]"}}',
+            '{"messageType":"E","response":{"message":"bad \\"data\\" : [1,2]"},"data":["T","x"]}',
+            '{"messageType":"A","response":{"data":[1]},"data":["T","btcusd","2026-02-13","gdax",1,2]}',
+            '{"messageType":"A","response":{"data":[1]}}',
+            '{"messageType":"A","data":[1],"data":["T","btcusd","2026-02-13","gdax",1,2]}',
+            '{"response":{"messageType":"H"},"messageType":"A","data":["T","btcusd","2026-02-13","gdax",1,2]}',
+            '{"service":"x{","messageType":"A","data":[2,3]}',
+            '{"data":["Q","btcusd","2026-02-13","gdax",1,2,3,4,5],"messageType":"H"}',
+            '{"messageType":"H","messageType":"A","data":["T","btcusd","2026-02-13","gdax",1,2]}',
+            '{"messageType":"Hx","data":["T","btcusd","2026-02-13","gdax",1,2]}',
+            ' {"messageType":"A","data":["T","btcusd","2026-02-13","gdax",1,2]}\n',
+        ]
+        for decoder in (IEX_DECODER, FX_DECODER, CRYPTO_DECODER, GENERIC_DECODER):
+            for frame in frames:
+                expected = json_loads_path(frame) or None
+                result = decoder.decode(frame)
+                self.assertEqual(list(result) if isinstance(result, tuple) else result, expected, msg=frame)
+
+    def test_invalid_frames(self):
+        for frame in ('{"messageType":"A","data":[1]} x', '{"messageType":"A","data":[1', ''):
+            for decoder in (CRYPTO_DECODER, GENERIC_DECODER):
+                with self.assertRaises(ValueError, msg=frame):
+                    decoder.decode(frame)
+
+    def test_integers(self):
+        self.assertIsInstance(FX_DECODER.decode(FX_FRAME).bid_size, float)
+        self.assertIsInstance(GENERIC_DECODER.decode('{"messageType":"A","data":[1]}')[0], int)
+
+    def test_decode_batch(self):
+        frames = [HEARTBEAT, CRYPTO_TRADE_FRAME, INIT, CRYPTO_QUOTE_FRAME]
+        records = CRYPTO_DECODER.decode_batch(frames)
+        self.assertEqual([type(record) for record in records], [CryptoTrade, CryptoQuote])
+
+    def test_records_by_len(self):
+        decoder = TiingoFrameDecoder(records_by_type={'Q': FxQuote}, records_by_len=(IexRefPx,))
+        self.assertIsInstance(decoder.decode(IEX_FRAME), IexRefPx)
+        self.assertIsInstance(decoder.decode(FX_FRAME), FxQuote)
+        self.assertEqual(decoder.decode('{"messageType":"A","data":[1,2]}'), [1, 2])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,245 @@
+import asyncio
+import json
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import patch
+from urllib.parse import urlparse, parse_qs
+from dateutil import parser
+
+from src import constants
+from src.constants import VENDOR_TIINGO, EXCH_IEX
+from src.data.sources.tiingo_rest import RateLimiter, PollingClient, tiingo_rest_poll, iex_stocks_poll_feed, \
+    fx_poll_feed, crypto_poll_feed, get_tiingo_polling_client
+from src.data import data_config as data_cfg
+
+
+class StandInTiingoHandler(BaseHTTPRequestHandler):
+    """
+    Local stand-in for the Tiingo top-of-book endpoints. Returns one row per requested ticker with an ETag
+    """
+    protocol_version = 'HTTP/1.1'
+    requests = []
+    connections = set()
+    payload_version = 1
+    send_etag = True
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        tickers = parse_qs(url.query)['tickers'][0].split(',')
+        cls = type(self)
+        cls.requests.append({'path': url.path, 'tickers': tickers, 'headers': dict(self.headers)})
+        cls.connections.add(self.client_address)
+
+        etag = f'"{url.query}-{cls.payload_version}"'
+        if cls.send_etag and self.headers.get('If-None-Match') == etag:
+            self.send_response(304)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        body = json.dumps([{'ticker': ticker, 'version': cls.payload_version} for ticker in tickers]).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        if cls.send_etag:
+            self.send_header('ETag', etag)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class TestTiingoRest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(('127.0.0.1', 0), StandInTiingoHandler)
+        cls.url = f'http://127.0.0.1:{cls.server.server_address[1]}/tiingo/fx/top'
+        cls.thread = threading.Thread(target=cls.server.serve_forever, daemon=True)
+        cls.thread.start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        StandInTiingoHandler.requests = []
+        StandInTiingoHandler.connections = set()
+        StandInTiingoHandler.payload_version = 1
+        StandInTiingoHandler.send_etag = True
+
+    def test_get_tiingo_polling_client(self):
+        async def run():
+            client = get_tiingo_polling_client(max_connections=3)
+            await client.aclose()
+            return client
+        client = asyncio.run(run())
+        self.assertEqual(client.client.headers['Authorization'], f'Token {data_cfg.TIINGO_REST_KEY}')
+
+    def test_conditional_requests_skip_unchanged_payloads(self):
+        async def run():
+            client = PollingClient()
+            try:
+                first = await client.get_if_changed(self.url, {'tickers': 'eurusd'})
+                second = await client.get_if_changed(self.url, {'tickers': 'eurusd'})
+                StandInTiingoHandler.payload_version = 2
+                third = await client.get_if_changed(self.url, {'tickers': 'eurusd'})
+            finally:
+                await client.aclose()
+            return first, second, third
+
+        first, second, third = asyncio.run(run())
+        self.assertEqual(first, [{'ticker': 'eurusd', 'version': 1}])
+        self.assertIsNone(second)
+        self.assertEqual(third, [{'ticker': 'eurusd', 'version': 2}])
+        self.assertEqual(StandInTiingoHandler.requests[1]['headers']['If-None-Match'], '"tickers=eurusd-1"')
+
+    def test_unchanged_payload_skipped_without_etag(self):
+        StandInTiingoHandler.send_etag = False
+
+        async def run():
+            client = PollingClient()
+            try:
+                return [await client.get_if_changed(self.url, {'tickers': 'eurusd'}) for _ in range(2)]
+            finally:
+                await client.aclose()
+
+        first, second = asyncio.run(run())
+        self.assertIsNotNone(first)
+        self.assertIsNone(second)
+        self.assertNotIn('If-None-Match', StandInTiingoHandler.requests[1]['headers'])
+
+    def test_tiingo_rest_poll_batches_and_pools_connections(self):
+        tickers = [f'PAIR{i}' for i in range(10)]
+
+        async def run():
+            client = PollingClient(max_connections=2)
+            rows = []
+
+            async def consume():
+                async for row in tiingo_rest_poll(client, self.url, tickers, batch_size=3, interval_s=0.05):
+                    rows.append(row)
+            try:
+                # Later cycles are answered with 304 for every batch, so nothing more is yielded
+                await asyncio.wait_for(consume(), timeout=0.3)
+            except asyncio.TimeoutError:
+                pass
+            finally:
+                await client.aclose()
+            return rows
+
+        rows = asyncio.run(run())
+        self.assertEqual(sorted(row['ticker'] for row in rows), sorted(ticker.lower() for ticker in tickers))
+        first_cycle = StandInTiingoHandler.requests[:4]
+        self.assertEqual([len(request['tickers']) for request in first_cycle], [3, 3, 3, 1])
+        self.assertGreater(len(StandInTiingoHandler.requests), 4)
+        self.assertLessEqual(len(StandInTiingoHandler.connections), 2)
+
+    def test_rate_limiter(self):
+        async def run():
+            rate_limiter = RateLimiter(max_requests=2, period_s=0.2)
+            started = time.monotonic()
+            for _ in range(4):
+                await rate_limiter.acquire()
+            return time.monotonic() - started
+
+        self.assertGreaterEqual(asyncio.run(run()), 0.19)
+
+    def test_throttled_endpoint_does_not_hold_connection_slots(self):
+        async def run():
+            client = PollingClient(max_connections=1)
+            throttled = RateLimiter(max_requests=1, period_s=10)
+            await throttled.acquire()
+            try:
+                waiting = asyncio.create_task(client.get_if_changed(self.url, {'tickers': 'usdjpy'}, throttled))
+                await asyncio.sleep(0.01)
+                other = await asyncio.wait_for(client.get_if_changed(self.url, {'tickers': 'eurusd'}), timeout=1)
+                waiting.cancel()
+                return other
+            finally:
+                await client.aclose()
+
+        self.assertEqual(asyncio.run(run()), [{'ticker': 'eurusd', 'version': 1}])
+
+    def run_feed(self, feed, rows, tickers):
+        async def mock_tiingo_rest_poll(*args, **kwargs):
+            for row in rows:
+                yield row
+
+        async def run():
+            queues = {name: asyncio.Queue() for name in ('trade_queue', 'quote_queue', 'ref_px_queue')}
+            with patch('src.data.sources.tiingo_rest.tiingo_rest_poll', mock_tiingo_rest_poll), \
+                    patch('src.data.sources.tiingo_rest.trade_queue', queues['trade_queue']), \
+                    patch('src.data.sources.tiingo_rest.quote_queue', queues['quote_queue']), \
+                    patch('src.data.sources.tiingo_rest.ref_px_queue', queues['ref_px_queue']):
+                await feed(tickers, client=None)
+            return {name: [queue.get_nowait()['market_feed'] for _ in range(queue.qsize())]
+                    for name, queue in queues.items()}
+        return asyncio.run(run())
+
+    def test_iex_stocks_poll_feed(self):
+        rows = [{'ticker': 'SPY', 'timestamp': '2026-02-13T10:00:00.123456-05:00', 'tngoLast': 10.735},
+                {'ticker': 'AAPL', 'timestamp': None, 'tngoLast': None}]
+        feeds = self.run_feed(iex_stocks_poll_feed, rows, {'STK': ['AAPL'], 'ETF': ['SPY']})
+        self.assertEqual(len(feeds['ref_px_queue']), 1)
+        feed = feeds['ref_px_queue'][0]
+        self.assertEqual(feed['symbol'], 'spy')
+        self.assertEqual(feed['price'], 10.735)
+        self.assertEqual(feed['event_type'], constants.EVENT_TYPE_REF_PX)
+        self.assertEqual(feed['exchange'], EXCH_IEX)
+        self.assertEqual(feed['source'], 'tiingo_iex_poll')
+        self.assertEqual(feed['event_time'], parser.isoparse('2026-02-13T10:00:00.123456-05:00'))
+
+    def test_fx_poll_feed(self):
+        rows = [{'ticker': 'eurusd', 'quoteTimestamp': '2026-02-13T15:00:00+00:00', 'bidPrice': 1.1, 'bidSize': 1e6,
+                 'askPrice': 1.2, 'askSize': 2e6, 'midPrice': 1.15}]
+        feed = self.run_feed(fx_poll_feed, rows, {'FX': ['eurusd']})['quote_queue'][0]
+        self.assertEqual((feed['bid'], feed['ask'], feed['mid']), (1.1, 1.2, 1.15))
+        self.assertEqual((feed['bid_size'], feed['ask_size']), (1e6, 2e6))
+        self.assertEqual(feed['asset_type'], constants.ASSET_TYPE_FX)
+        self.assertEqual(feed['vendor'], VENDOR_TIINGO)
+        self.assertEqual(feed['event_time'].tzinfo.zone, constants.NY_TZ.zone)
+
+    def test_crypto_poll_feed(self):
+        rows = [{'ticker': 'btcusd', 'topOfBookData': [{
+            'lastSaleTimestamp': '2026-02-13T15:00:01+00:00', 'lastPrice': 100.5, 'lastSize': 0.1,
+            'lastExchange': 'GDAX', 'quoteTimestamp': '2026-02-13T15:00:00+00:00', 'bidPrice': 100.0,
+            'bidSize': 1.0, 'askPrice': 101.0, 'askSize': 2.0}]}]
+        feeds = self.run_feed(crypto_poll_feed, rows, {'CRYPTO': ['btcusd']})
+        trade, quote = feeds['trade_queue'][0], feeds['quote_queue'][0]
+        self.assertEqual((trade['last_price'], trade['last_size'], trade['exchange']), (100.5, 0.1, 'GDAX'))
+        self.assertEqual(trade['event_type'], constants.EVENT_TYPE_TRADE)
+        self.assertEqual((quote['bid'], quote['ask'], quote['mid']), (100.0, 101.0, 100.5))
+        self.assertIsNone(quote['exchange'])
+        self.assertEqual(quote['source'], 'tiingo_crypto_poll')
+
+    def test_poll_feeds_skip_rows_without_new_timestamps(self):
+        fx_rows = [{'ticker': 'eurusd', 'quoteTimestamp': '2026-02-13T15:00:00+00:00', 'bidPrice': 1.1, 'askPrice': 1.2},
+                   {'ticker': 'usdjpy', 'quoteTimestamp': '2026-02-13T15:00:00+00:00', 'bidPrice': 150.0,
+                    'askPrice': 150.1},
+                   # Next poll of the same batch, only eurusd changed
+                   {'ticker': 'eurusd', 'quoteTimestamp': '2026-02-13T15:00:01+00:00', 'bidPrice': 1.2, 'askPrice': 1.3},
+                   {'ticker': 'usdjpy', 'quoteTimestamp': '2026-02-13T15:00:00+00:00', 'bidPrice': 150.0,
+                    'askPrice': 150.1}]
+        quotes = self.run_feed(fx_poll_feed, fx_rows, {'FX': ['eurusd', 'usdjpy']})['quote_queue']
+        self.assertEqual([(quote['symbol'], quote['bid']) for quote in quotes],
+                         [('eurusd', 1.1), ('usdjpy', 150.0), ('eurusd', 1.2)])
+
+        def crypto_row(trade_second, quote_second):
+            return {'ticker': 'btcusd', 'topOfBookData': [{
+                'lastSaleTimestamp': f'2026-02-13T15:00:0{trade_second}+00:00', 'lastPrice': 100.5,
+                'quoteTimestamp': f'2026-02-13T15:00:0{quote_second}+00:00', 'bidPrice': 100.0, 'askPrice': 101.0}]}
+        feeds = self.run_feed(crypto_poll_feed, [crypto_row(1, 1), crypto_row(1, 2), crypto_row(0, 2)],
+                              {'CRYPTO': ['btcusd']})
+        self.assertEqual(len(feeds['trade_queue']), 1)
+        self.assertEqual(len(feeds['quote_queue']), 2)
+
+        iex_rows = [{'ticker': 'SPY', 'timestamp': '2026-02-13T10:00:00-05:00', 'tngoLast': 10.7}] * 2
+        feeds = self.run_feed(iex_stocks_poll_feed, iex_rows, {'STK': [], 'ETF': ['SPY']})
+        self.assertEqual(len(feeds['ref_px_queue']), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
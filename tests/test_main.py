@@ -8,6 +8,8 @@ class TestMain(unittest.IsolatedAsyncioTestCase):
 
         with patch("src.main.load_tickers", return_value=tickers) as mock_load, \
              patch("src.main.run_consolidator", new_callable=AsyncMock) as mock_consolidator, \
+             patch("src.main.run_bar_aggregator", new_callable=AsyncMock) as mock_bar_aggregator, \
+             patch("src.main.run_bbo_engine", new_callable=AsyncMock) as mock_bbo_engine, \
              patch("src.main.tiingo.iex_stocks_feed", new_callable=AsyncMock) as mock_iex, \
              patch("src.main.tiingo.crypto_feed", new_callable=AsyncMock) as mock_crypto, \
              patch("src.main.tiingo.fx_feed", new_callable=AsyncMock) as mock_fx, \
@@ -16,7 +18,9 @@ class TestMain(unittest.IsolatedAsyncioTestCase):
             await startup()
 
             mock_load.assert_called_once()
-            self.assertEqual(mock_create_task.call_count, 4)
+            self.assertEqual(mock_create_task.call_count, 6)
+            mock_bar_aggregator.assert_called_once_with()
+            mock_bbo_engine.assert_called_once_with()
             mock_iex.assert_called_once_with(tickers)
             mock_crypto.assert_called_once_with(tickers)
             mock_fx.assert_called_once_with(tickers)
@@ -3,7 +3,7 @@ from unittest.mock import patch
 from datetime import datetime as dtt
 import pytz
 from src.logger import get_logger
-from src.utils import load_tickers, convert_dt_to_tz
+from src.utils import load_tickers, convert_dt_to_tz, to_epoch_us
 from src.constants import NY_TZ
 
 logger = get_logger(__name__)
@@ -44,3 +44,8 @@ class TestUtils(unittest.TestCase):
         dt_converted = convert_dt_to_tz(naive_dt, tz=custom_tz)
         self.assertEqual(dt_converted.tzinfo.zone, custom_tz.zone)
         self.assertEqual(dt_converted.hour, pytz.UTC.localize(naive_dt).astimezone(custom_tz).hour)
+
+    def test_to_epoch_us(self):
+        aware_dt = NY_TZ.localize(dtt(2026, 2, 13, 9, 30, 0, 123456))
+        self.assertEqual(to_epoch_us(aware_dt), 1770993000123456)
+        self.assertEqual(to_epoch_us(dtt(1970, 1, 1, 0, 0, 1)), 1_000_000)